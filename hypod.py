@@ -1,26 +1,34 @@
 import discord
 from discord.ext import commands
 import asyncio
-import subprocess
 import json
 from datetime import datetime
-import shlex
 import logging
+import re
 import shutil
 import os
+from collections import Counter, deque
+from dataclasses import dataclass, field as dc_field
+from itertools import chain, islice
+from operator import itemgetter
 from typing import Optional, List, Dict, Any
-import threading
 import time
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
 load_dotenv()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('vps_bot')
 
-# Check if lxc command is available
-if not shutil.which("lxc"):
+# Check if lxc command is available; resolve it once so spawns skip the PATH search
+LXC_BIN = shutil.which("lxc")
+if not LXC_BIN:
     logger.error("LXC command not found. Please ensure LXC is installed.")
     raise SystemExit("LXC command not found. Please ensure LXC is installed.")
 
@@ -28,12 +36,25 @@ if not shutil.which("lxc"):
 intents = discord.Intents.default()
 intents.messages = True
 intents.message_content = True
-intents.members = True
+# No member cache: Member arguments resolve from the message mentions or an on-demand lookup
+intents.members = False
+
+class VPSBot(commands.Bot):
+    async def setup_hook(self):
+        create_loop_primitives()
+        # Read the data files while the gateway handshake runs instead of before it
+        start_background_task('load_data', load_data)
+
+    async def close(self):
+        # Write anything the debounced flusher hasn't persisted yet before disconnecting
+        await flush_pending()
+        await super().close()
 
-bot = commands.Bot(command_prefix='.', intents=intents, help_command=None)
+bot = VPSBot(command_prefix='.', intents=intents, help_command=None, chunk_guilds_at_startup=False)
 
 # Main admin user ID
 MAIN_ADMIN_ID = 1061287786755395585
+_MAIN_ADMIN_STR = str(MAIN_ADMIN_ID)
 
 # VPS User Role ID
 VPS_USER_ROLE_ID = None
@@ -59,36 +80,270 @@ PRICES = {
 }
 
 # ----------------- JSON helpers -----------------
+def _json_default(obj):
+    # Sets are kept in memory for O(1) membership and stored as sorted lists
+    if isinstance(obj, set):
+        return sorted(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+if orjson:
+    json_loads = orjson.loads
+
+    def json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, default=_json_default)
+else:
+    json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':'), default=_json_default).encode()
+
 def load_json_file(path: str, default):
     try:
-        with open(path, 'r') as f:
-            return json.load(f)
+        with open(path, 'rb') as f:
+            return json_loads(f.read())
     except (FileNotFoundError, json.JSONDecodeError):
         logger.warning(f"{path} not found or invalid - initializing default")
         return default
 
-# Keep vps_data as {user_id: [vps_info, ...], ...}
-user_data = load_json_file('user_data.json', {})
-vps_data = load_json_file('vps_data.json', {})
-admin_data = load_json_file('admin_data.json', {"admins": [str(MAIN_ADMIN_ID)]})
+DATA_FILES = {
+    'users': 'user_data.json',
+    'vps': 'vps_data.json',
+    'admins': 'admin_data.json',
+}
+SAVE_DELAY = 0.5  # Seconds to coalesce bursts of mutations into a single write
 
-def save_data():
+# Keep vps_data as {user_id: [vps_info, ...], ...}
+# Filled in place by load_data() once the bot starts; wait on data_ready before touching them
+user_data: Dict[str, Any] = {}
+vps_data: Dict[str, Any] = {}
+admin_data: Dict[str, Any] = {}
+DATA_OBJECTS = {'users': user_data, 'vps': vps_data, 'admins': admin_data}
+DATA_DEFAULTS = {'users': {}, 'vps': {}, 'admins': {"admins": [_MAIN_ADMIN_STR]}}
+data_ready: Optional[asyncio.Event] = None  # Created on the bot loop by create_loop_primitives()
+
+# Numeric spec field -> how to derive it from the display strings of records saved before it existed
+_SPEC_PARSERS = (
+    ('ram_mb', lambda vps: int(vps['ram'].upper().replace('GB', '')) * 1024),
+    ('cpu_cores', lambda vps: int(vps['cpu'])),
+    ('storage_gb', lambda vps: int(vps.get('storage', '10GB').upper().replace('GB', ''))),
+)
+
+def migrate_vps_records():
+    """Backfill numeric ram_mb/cpu_cores/storage_gb on records saved before they existed,
+       and load shared_with as a set."""
+    for vps_list in vps_data.values():
+        for vps in vps_list:
+            vps['shared_with'] = set(vps.get('shared_with', ()))
+            # Validated here once, so the stats loops can add the ints without guarding each record
+            for field, parse in _SPEC_PARSERS:
+                if field in vps:
+                    continue
+                try:
+                    vps[field] = parse(vps)
+                except (KeyError, ValueError, AttributeError):
+                    logger.warning(f"Could not parse {field} of {vps.get('container_name')}; leaving it unset")
+
+# container_name -> (user_id, index into vps_data[user_id])
+container_index: Dict[str, tuple] = {}
+pending_container_names: set = set()  # Names handed out by new_container_name whose container is still being created
+
+def rebuild_container_index():
+    """Recompute container_index; call after anything that shifts positions in vps_data."""
+    container_index.clear()
+    container_index.update(
+        (vps['container_name'], (uid, i)) for uid, vps_list in vps_data.items() for i, vps in enumerate(vps_list)
+    )
+
+def reindex_user(user_id: str):
+    """Refresh container_index positions for one user's list after an entry was removed from it."""
+    for i, vps in enumerate(vps_data.get(user_id, [])):
+        container_index[vps['container_name']] = (user_id, i)
+
+def find_vps(container_name: str):
+    """Return (user_id, vps) for a container name, or (None, None) if the bot doesn't track it."""
+    entry = container_index.get(container_name)
+    if entry is None:
+        return None, None
+    user_id, i = entry
+    return user_id, vps_data[user_id][i]
+
+def add_vps_record(user_id: str, vps_info: dict) -> int:
+    """Append a VPS for the user and return its 1-based VPS number."""
+    vps_list = vps_data.setdefault(user_id, [])
+    vps_list.append(vps_info)
+    container_index[vps_info['container_name']] = (user_id, len(vps_list) - 1)
+    return len(vps_list)
+
+def remove_vps_record(user_id: str, index: int) -> dict:
+    """Drop one VPS from a user's list, keeping container_index in step; empty lists are removed."""
+    vps_list = vps_data[user_id]
+    vps = vps_list.pop(index)
+    container_index.pop(vps['container_name'], None)
+    status_cache.pop(vps['container_name'], None)
+    if vps_list:
+        reindex_user(user_id)
+    else:
+        del vps_data[user_id]
+    return vps
+
+def new_container_name(user_id: str) -> str:
+    """Reserve the next free vps-<uid>-<n> name; the list length alone can repeat a live name after a delete.
+       The caller must discard it from pending_container_names once the record is added or creation fails."""
+    n = len(vps_data.get(user_id, ())) + 1
+    while f"vps-{user_id}-{n}" in container_index or f"vps-{user_id}-{n}" in pending_container_names:
+        n += 1
+    name = f"vps-{user_id}-{n}"
+    pending_container_names.add(name)
+    return name
+
+async def load_data():
+    """Read and parse the data files off the loop, then build the derived lookups.
+       Any failure shuts the bot down; commands would otherwise wait on data_ready forever."""
     try:
-        with open('user_data.json', 'w') as f:
-            json.dump(user_data, f, indent=4)
-        with open('vps_data.json', 'w') as f:
-            json.dump(vps_data, f, indent=4)
-        with open('admin_data.json', 'w') as f:
-            json.dump(admin_data, f, indent=4)
-        logger.info("Data saved")
+        for name, path in DATA_FILES.items():
+            loaded = await asyncio.to_thread(load_json_file, path, DATA_DEFAULTS[name])
+            DATA_OBJECTS[name].update(loaded)
+        migrate_vps_records()
+        for user in user_data.values():
+            user.setdefault('credits', 0)  # New accounts always start with the key; old files may not have it
+        # A set in memory for O(1) checks; json_dumps writes it back as a sorted list
+        admin_data["admins"] = set(admin_data.get("admins", ()))
+        rebuild_container_index()
     except Exception as e:
-        logger.exception(f"Failed to save data: {e}")
+        logger.exception(f"Failed to load data files, shutting down: {e}")
+        # data_ready stays unset, so close() won't flush the half-loaded dicts over the files
+        await bot.close()
+        raise
+    data_ready.set()
+    logger.info(f"Loaded data for {len(user_data)} users and {len(container_index)} VPS")
+
+# Names from DATA_FILES waiting to be written by the flusher task
+save_dirty: set = set()
+save_event: Optional[asyncio.Event] = None  # Created on the bot loop by create_loop_primitives()
+
+def mark_dirty(*names):
+    """Schedule the given data files ('users', 'vps', 'admins') to be written by the flusher."""
+    global server_totals
+    server_totals = None  # Every mutation goes through here, so the cached totals can't go stale
+    save_dirty.update(names)
+    save_event.set()
+
+# Per-file shorthands: a credit change only rewrites user_data.json, an admin change only admin_data.json
+def save_users():
+    mark_dirty('users')
+
+def save_vps():
+    mark_dirty('vps')
+
+def save_admins():
+    mark_dirty('admins')
+
+_datasync = getattr(os, 'fdatasync', os.fsync)  # fdatasync skips the metadata-only flush where available
+
+def write_json_atomic(path: str, payload: bytes):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        # Data must be on disk before the rename, or a crash can leave an empty file under the real name
+        _datasync(f.fileno())
+    os.replace(tmp, path)
+
+def write_payloads(payloads):
+    for path, payload in payloads:
+        write_json_atomic(path, payload)
+
+save_lock: Optional[asyncio.Lock] = None  # Keeps an older snapshot from landing after a newer one
+
+async def save_data(*names):
+    """Write the given data files (all by default); the disk I/O runs in a worker thread."""
+    names = names or tuple(DATA_FILES)
+    async with save_lock:
+        # Serialize on the loop so handlers can't mutate the dicts mid-dump. orjson holds the GIL for
+        # the whole call, so running it in the worker thread would stall the loop just the same;
+        # only the blocking file I/O is worth moving off the loop.
+        payloads = [(DATA_FILES[name], json_dumps(DATA_OBJECTS[name])) for name in names]
+        await asyncio.to_thread(write_payloads, payloads)
+    logger.info(f"Data saved ({', '.join(names)})")
+
+async def flush_pending():
+    """Write every dirty file now instead of waiting for the flusher."""
+    if data_ready is None or not data_ready.is_set():  # Never overwrite the files with the empty pre-load dicts
+        return
+    names = sorted(save_dirty)
+    save_dirty.clear()
+    save_event.clear()
+    if names:
+        await save_data(*names)
+
+async def flusher():
+    """Coalesce mark_dirty() calls and write only the files that changed."""
+    await data_ready.wait()
+    while True:
+        await save_event.wait()
+        await asyncio.sleep(SAVE_DELAY)
+        save_event.clear()
+        names = sorted(save_dirty)
+        save_dirty.clear()
+        if not names:  # Already written by flush_pending()
+            continue
+        try:
+            await save_data(*names)
+        except Exception as e:
+            logger.exception(f"Failed to save data: {e}")
+            mark_dirty(*names)
+
+# ----------------- Server totals -----------------
+@dataclass
+class ServerTotals:
+    users: int = 0
+    credits: int = 0
+    vps_count: int = 0
+    running: int = 0
+    ram_mb: int = 0
+    cpu_cores: int = 0
+    statuses: Counter = dc_field(default_factory=Counter)  # status -> VPS count
+
+server_totals: Optional[ServerTotals] = None  # Cleared by mark_dirty(); rebuilt on the next read
+
+_get_credits = itemgetter('credits')
+
+def compute_server_totals() -> ServerTotals:
+    totals = ServerTotals(users=len(user_data))
+    # Every user record has 'credits' (set at creation, backfilled by load_data), so sum in C via map
+    totals.credits = sum(map(_get_credits, user_data.values()))
+    # Flatten the per-user lists once; each tally below is then a single flat pass
+    all_vps = list(chain.from_iterable(vps_data.values()))
+    totals.vps_count = len(all_vps)
+    # Counter tallies every status in one pass, so states other than running/stopped show up too
+    totals.statuses = Counter(vps.get('status', 'unknown') for vps in all_vps)
+    totals.running = totals.statuses['running']
+    # Numeric fields are filled in at creation/resize and by migrate_vps_records(); records it couldn't parse count as 0
+    totals.ram_mb = sum(vps.get('ram_mb', 0) for vps in all_vps)
+    totals.cpu_cores = sum(vps.get('cpu_cores', 0) for vps in all_vps)
+    return totals
+
+def get_server_totals() -> ServerTotals:
+    """Totals for .serverstats; rescans the data only after something changed since the last call."""
+    global server_totals
+    if server_totals is None:
+        server_totals = compute_server_totals()
+    return server_totals
 
 # ----------------- Permission checks -----------------
+@bot.check
+async def wait_for_data(ctx):
+    # Commands sent during startup wait for load_data() instead of seeing empty data
+    await data_ready.wait()
+    return True
+
+def _is_admin(user_id: str) -> bool:
+    """True for the main admin or anyone in the admins set; user_id is the str form used as data keys."""
+    return user_id == _MAIN_ADMIN_STR or user_id in admin_data["admins"]
+
 def is_admin():
     async def predicate(ctx):
-        user_id = str(ctx.author.id)
-        if user_id == str(MAIN_ADMIN_ID) or user_id in admin_data.get("admins", []):
+        if _is_admin(str(ctx.author.id)):
             return True
         await ctx.send(embed=create_error_embed("Access Denied", "You don't have permission to use this command."))
         return False
@@ -96,47 +351,142 @@ def is_admin():
 
 def is_main_admin():
     async def predicate(ctx):
-        if str(ctx.author.id) == str(MAIN_ADMIN_ID):
+        if str(ctx.author.id) == _MAIN_ADMIN_STR:
             return True
         await ctx.send(embed=create_error_embed("Access Denied", "Only the main admin can use this command."))
         return False
     return commands.check(predicate)
 
 # ----------------- Embeds -----------------
-def create_embed(title, description="", color=0x1a1a1a, fields=None):
-    embed = discord.Embed(title=f"▌ {title}", description=description, color=color)
-    embed.set_thumbnail(url="https://i.postimg.cc/XYYnZGG5/trashed-1765164388-image-3.jpg")
+_THUMB = "https://i.postimg.cc/XYYnZGG5/trashed-1765164388-image-3.jpg"
+_FOOTER_ICON = _THUMB
+_TITLE_PREFIX = "▌ "
+_FOOTER_PREFIX = "KEXSON HOSTS V1 • "
+# Colour objects built once; Embed stores a Colour as-is but wraps a raw int in a new one every time
+_DEFAULT_COLOR = discord.Color(0x1a1a1a)
+_SUCCESS_COLOR = discord.Color(0x00ff88)
+_ERROR_COLOR = discord.Color(0xff3366)
+_INFO_COLOR = discord.Color(0x00ccff)
+_WARNING_COLOR = discord.Color(0xffaa00)
+_footer_ts_cache = (0, "")  # (unix second, footer text) for the most recent embed
+
+def _footer_text():
+    """Footer text with the current local time; formatted at most once per second."""
+    global _footer_ts_cache
+    now = int(time.time())
+    if _footer_ts_cache[0] != now:
+        _footer_ts_cache = (now, _FOOTER_PREFIX + time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now)))
+    return _footer_ts_cache[1]
+
+def _embed(title, description, color):
+    # Assign the thumbnail/footer dicts directly; set_thumbnail/set_footer only rebuild the same dicts
+    embed = discord.Embed(title=_TITLE_PREFIX + title, description=description, color=color)
+    embed._thumbnail = {'url': _THUMB}
+    embed._footer = {'text': _footer_text(), 'icon_url': _FOOTER_ICON}
+    return embed
+
+def create_embed(title, description="", color=_DEFAULT_COLOR, fields=None):
+    embed = _embed(title, description, color)
     if fields:
         for field in fields:
             embed.add_field(name=f"▸ {field['name']}", value=field['value'], inline=field.get('inline', False))
-    embed.set_footer(text=f"KEXSON HOSTS V1 • {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                     icon_url="https://i.postimg.cc/XYYnZGG5/trashed-1765164388-image-3.jpg")
     return embed
 
 def create_success_embed(title, description=""):
-    return create_embed(title, description, color=0x00ff88)
+    return _embed(title, description, _SUCCESS_COLOR)
 
 def create_error_embed(title, description=""):
-    return create_embed(title, description, color=0xff3366)
+    return _embed(title, description, _ERROR_COLOR)
 
 def create_info_embed(title, description=""):
-    return create_embed(title, description, color=0x00ccff)
+    return _embed(title, description, _INFO_COLOR)
 
 def create_warning_embed(title, description=""):
-    return create_embed(title, description, color=0xffaa00)
+    return _embed(title, description, _WARNING_COLOR)
+
+def add_line_fields(embed, name, lines, per_field, max_lines=None):
+    """Add lines as consecutive "name (a-b)" fields of per_field lines each, consuming one iterator."""
+    it = islice(lines, max_lines)
+    start = 1
+    while chunk := list(islice(it, per_field)):
+        end = start + len(chunk) - 1
+        embed.add_field(name=f"{name} ({start}-{end})", value="\n".join(chunk), inline=False)
+        start = end + 1
 
 # ----------------- LXC execution helper -----------------
-async def execute_lxc(command, timeout=300):
-    """Execute LXC command with timeout and error handling"""
+# Python creates fds non-inheritable (PEP 446), so lxc can't inherit the gateway socket anyway.
+# Skipping the close-all-fds pass lets subprocess spawn via posix_spawn with the absolute LXC_BIN.
+SPAWN_KWARGS = {'close_fds': False}
+
+LXC_MAX_CONCURRENCY = 4  # lxc processes allowed to run at once
+LXC_READ_CONCURRENCY = 16  # Separate, looser limit for read-only queries
+LXC_LONG_CONCURRENCY = 2  # Launches and in-guest installs, kept apart so they can't starve start/stop
+LXC_SEM: Optional[asyncio.Semaphore] = None  # Created on the bot loop by create_loop_primitives()
+LXC_READ_SEM: Optional[asyncio.Semaphore] = None
+LXC_LONG_SEM: Optional[asyncio.Semaphore] = None
+LXC_OUTPUT_CHUNK = 1024   # Bytes per read when draining lxc output
+LXC_OUTPUT_CHUNKS = 64    # Chunks kept per stream, i.e. the last ~64 KiB
+
+async def drain_tail(stream, keep=LXC_OUTPUT_CHUNKS):
+    """Read stream to EOF, keeping only the last `keep` chunks (everything if keep is None)."""
+    tail = deque(maxlen=keep)
+    while True:
+        chunk = await stream.read(LXC_OUTPUT_CHUNK)
+        if not chunk:
+            break
+        tail.append(chunk)
+    return b"".join(tail)
+
+class _NoLimit:
+    """Stand-in for a semaphore when a command must not queue behind the others."""
+    async def acquire(self):
+        return True
+
+    def release(self):
+        pass
+
+_NO_LIMIT = _NoLimit()
+
+async def execute_lxc(*argv, timeout=300, readonly=False, full_output=False, bypass_limit=False, long_running=False):
+    """Execute LXC command (given as separate argv entries) with timeout and error handling.
+       Only the tail of stdout is kept unless full_output is set (needed for parseable listings).
+       long_running routes launches/provisioning to their own semaphore; bypass_limit skips
+       the semaphores entirely and is only for emergency stops. The timeout includes queueing."""
+    command = " ".join(argv)
+    if argv[0] == "lxc":
+        argv = (LXC_BIN,) + argv[1:]
+    if bypass_limit:
+        limit = _NO_LIMIT
+    elif long_running:
+        limit = LXC_LONG_SEM
+    else:
+        limit = LXC_READ_SEM if readonly else LXC_SEM
+    deadline = time.monotonic() + timeout
     try:
-        logger.info(f"Executing: {command}")
-        cmd = shlex.split(command)
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        await asyncio.wait_for(limit.acquire(), timeout=timeout)
+        try:
+            logger.info(f"Executing: {command}")
+            proc = await asyncio.create_subprocess_exec(
+                *argv,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                **SPAWN_KWARGS
+            )
+            try:
+                stdout, stderr, _ = await asyncio.wait_for(
+                    asyncio.gather(
+                        drain_tail(proc.stdout, None if full_output else LXC_OUTPUT_CHUNKS),
+                        drain_tail(proc.stderr),
+                        proc.wait()
+                    ),
+                    timeout=max(deadline - time.monotonic(), 0)
+                )
+            except asyncio.TimeoutError:
+                if proc.returncode is None:
+                    proc.kill()
+                raise
+        finally:
+            limit.release()
         out = stdout.decode().strip() if stdout else ""
         err = stderr.decode().strip() if stderr else ""
         if proc.returncode != 0:
@@ -150,84 +500,294 @@ async def execute_lxc(command, timeout=300):
         logger.exception(f"LXC execution failed: {e}")
         raise
 
+# ----------------- Live container status -----------------
+STATUS_TTL = 5  # Seconds a status read from lxc is trusted
+status_cache: Dict[str, tuple] = {}  # container_name -> (time.monotonic(), status)
+
+# (emoji, label) for list lines; other lxc states (frozen, error, ...) go through status_display()
+_STATUS_DISPLAY = {
+    'running': ("🟢", "RUNNING"),
+    'stopped': ("🔴", "STOPPED"),
+    'unknown': ("🔴", "UNKNOWN"),
+}
+
+def status_display(status):
+    return _STATUS_DISPLAY.get(status) or ("🔴", status.upper())
+
+def parse_status_csv(out):
+    """Map container name -> lowercase status from `lxc list --format csv -c ns` output."""
+    states = {}
+    if isinstance(out, str):
+        for line in out.splitlines():
+            name, _, status = line.partition(',')
+            states[name] = status.lower()
+    return states
+
+async def refresh_statuses(names, timeout=30):
+    """Fill status_cache for containers without a fresh entry using a single `lxc list` call."""
+    now = time.monotonic()
+    stale = [name for name in names if now - status_cache.get(name, (float('-inf'),))[0] > STATUS_TTL]
+    if not stale:
+        return
+    pattern = "^(" + "|".join(re.escape(name) for name in stale) + ")$"
+    try:
+        out = await execute_lxc("lxc", "list", pattern, "--format", "csv", "-c", "ns",
+                                timeout=timeout, readonly=True, full_output=True)
+    except Exception as e:
+        logger.warning(f"Could not refresh container status: {e}")
+        return
+    now = time.monotonic()
+    for name, status in parse_status_csv(out).items():
+        status_cache[name] = (now, status)
+
+def cached_status(vps):
+    """Last known live status of a VPS, falling back to the stored one."""
+    entry = status_cache.get(vps['container_name'])
+    return entry[1] if entry else vps.get('status', 'unknown')
+
+def set_vps_status(vps, status: str):
+    """Record a status change the bot just made, in both the stored record and the cache."""
+    vps['status'] = status
+    status_cache[vps['container_name']] = (time.monotonic(), status)
+
+RECONCILE_INTERVAL = 60  # Seconds between full status syncs with lxc
+
+last_reconcile = float('-inf')  # time.monotonic() of the last successful reconcile_states()
+
+async def reconcile_states(timeout=60):
+    """Bring every stored VPS status in line with lxc using a single `lxc list` call."""
+    global last_reconcile
+    out = await execute_lxc("lxc", "list", "--format", "csv", "-c", "ns", timeout=timeout, readonly=True, full_output=True)
+    states = parse_status_csv(out)
+    now = time.monotonic()
+    changed = False
+    for name, (user_id, i) in container_index.items():
+        status = states.get(name)
+        if status is None:
+            continue
+        status_cache[name] = (now, status)
+        vps = vps_data[user_id][i]
+        if vps.get('status') != status:
+            vps['status'] = status
+            changed = True
+    last_reconcile = now
+    if changed:
+        save_vps()
+
+async def reconcile_task():
+    await data_ready.wait()
+    while True:
+        try:
+            await reconcile_states()
+        except Exception as e:
+            logger.warning(f"Status reconcile failed: {e}")
+        await asyncio.sleep(RECONCILE_INTERVAL)
+
+# Held around every `lxc stop --all` (stop-vps-all and the CPU monitor) so they never overlap
+stop_all_lock: Optional[asyncio.Lock] = None  # Created on the bot loop by create_loop_primitives()
+
+def mark_all_stopped():
+    """Flip every running record to stopped after `lxc stop --all`; returns how many changed."""
+    stopped = 0
+    for vps_list in vps_data.values():
+        for vps in vps_list:
+            if vps.get('status') == 'running':
+                vps['status'] = 'stopped'
+                stopped += 1
+    status_cache.clear()
+    save_vps()
+    return stopped
+
+async def stop_all_containers():
+    """`lxc stop --all --force` for stop-vps-all and the CPU monitor; returns (records flipped, lxc output).
+       Skips the lxc semaphores: long launches/installs holding permits are what overloads the host in the first place."""
+    async with stop_all_lock:
+        out = await execute_lxc("lxc", "stop", "--all", "--force", bypass_limit=True)
+        stopped = mark_all_stopped()
+        try:
+            await reconcile_states()
+        except Exception as e:
+            logger.warning(f"Status reconcile after stop-all failed: {e}")
+    return stopped, out if isinstance(out, str) else ""
+
+# ----------------- Discord user lookups -----------------
+USER_CACHE_TTL = 300   # Seconds a fetched discord.User is reused
+USER_CACHE_MAX = 4096
+user_cache: Dict[int, tuple] = {}  # user id -> (time.monotonic(), discord.User)
+
+async def get_user_cached(user_id: int):
+    """bot.get_user, else bot.fetch_user with a short-lived cache; raises like fetch_user on a miss."""
+    user = bot.get_user(user_id)  # The gateway's own user cache needs no HTTP round-trip
+    if user is not None:
+        return user
+    now = time.monotonic()
+    entry = user_cache.get(user_id)
+    if entry and now - entry[0] < USER_CACHE_TTL:
+        return entry[1]
+    user = await bot.fetch_user(user_id)
+    if len(user_cache) >= USER_CACHE_MAX:
+        user_cache.pop(next(iter(user_cache)))  # Evict the oldest insertion
+    user_cache[user_id] = (now, user)
+    return user
+
 # ----------------- CPU monitor -----------------
-def get_cpu_usage():
+CPU_SAMPLE_SECONDS = 0.5  # Gap between the two /proc/stat reads
+
+def read_cpu_times():
+    """Return (idle, total) jiffies from the aggregate 'cpu' line of /proc/stat.
+       Fields: user nice system idle iowait irq softirq steal guest guest_nice"""
+    with open('/proc/stat', 'rb') as f:
+        times = [int(v) for v in f.readline().split()[1:11]]
+    # guest/guest_nice are already counted in user/nice
+    return times[3] + times[4], sum(times[:8])
+
+async def get_cpu_usage():
     try:
-        result = subprocess.run(['top', '-bn1'], capture_output=True, text=True)
-        output = result.stdout
-        for line in output.split('\n'):
-            if '%Cpu(s):' in line or 'Cpu(s):' in line:
-                parts = line.split(',')
-                for part in parts:
-                    if 'id' in part:
-                        try:
-                            idle = float(part.split('%')[0].split()[-1])
-                            return 100.0 - idle
-                        except:
-                            continue
-        return 0.0
+        idle1, total1 = read_cpu_times()
+        await asyncio.sleep(CPU_SAMPLE_SECONDS)
+        idle2, total2 = read_cpu_times()
+        total_delta = total2 - total1
+        if total_delta <= 0:
+            return 0.0
+        return 100.0 * (1 - (idle2 - idle1) / total_delta)
     except Exception as e:
         logger.exception(f"Error reading CPU usage: {e}")
         return 0.0
 
-def cpu_monitor():
-    global cpu_monitor_active
-    while cpu_monitor_active:
+async def cpu_monitor_task():
+    """Runs on the bot loop; stops every VPS when host CPU stays above the threshold."""
+    await data_ready.wait()
+    while True:
         try:
-            cpu_usage = get_cpu_usage()
-            logger.info(f"CPU usage: {cpu_usage}%")
-            if cpu_usage > CPU_THRESHOLD:
-                logger.warning(f"CPU {cpu_usage}% > threshold {CPU_THRESHOLD}% — stopping all VPS")
-                try:
-                    subprocess.run(['lxc', 'stop', '--all', '--force'], check=True)
-                    for user_id, vps_list in vps_data.items():
-                        for vps in vps_list:
-                            if vps.get('status') == 'running':
-                                vps['status'] = 'stopped'
-                    save_data()
-                except Exception as e:
-                    logger.exception(f"Failed to stop all VPS: {e}")
-            time.sleep(CHECK_INTERVAL)
+            if cpu_monitor_active:
+                cpu_usage = await get_cpu_usage()
+                logger.info(f"CPU usage: {cpu_usage:.1f}%")
+                if cpu_usage > CPU_THRESHOLD:
+                    logger.warning(f"CPU {cpu_usage:.1f}% > threshold {CPU_THRESHOLD}% — stopping all VPS")
+                    try:
+                        await stop_all_containers()
+                    except Exception as e:
+                        logger.exception(f"Failed to stop all VPS: {e}")
         except Exception as e:
             logger.exception(f"CPU monitor error: {e}")
-            time.sleep(CHECK_INTERVAL)
+        await asyncio.sleep(CHECK_INTERVAL)
 
-cpu_thread = threading.Thread(target=cpu_monitor, daemon=True)
-cpu_thread.start()
+# Strong references to long-running loop tasks, keyed by name
+background_tasks: Dict[str, asyncio.Task] = {}
+
+def start_background_task(name: str, coro_fn):
+    """Start coro_fn() on the bot loop unless it is already running (on_ready fires on every reconnect)."""
+    task = background_tasks.get(name)
+    if task is None or task.done():
+        background_tasks[name] = bot.loop.create_task(coro_fn(), name=name)
 
 # ----------------- Disk resizing helpers -----------------
-async def set_root_disk_size(container_name: str, size_gb: int):
-    """Set LXD root disk size (best-effort) and try to grow filesystem inside container.
-       This assumes Linux inside container uses /dev/sda and ext4. Debian images usually fit."""
+async def _host_resize(container_name: str, size_gb: int):
+    """Set root device size (quota) on the host."""
     try:
-        # Set root device size (quota) on the host
-        await execute_lxc(f"lxc config device set {container_name} root size={size_gb}GB")
+        await execute_lxc("lxc", "config", "device", "set", container_name, "root", f"size={size_gb}GB")
     except Exception as e:
         logger.exception(f"Failed to override root device size for {container_name}: {e}")
         raise
 
-    # Attempt in-container grow (best-effort). This may fail on some setups.
+async def _guest_prepare(container_name: str):
+    """Install growpart inside the container (best-effort)."""
     try:
-        # Using growpart + resize2fs; allow commands to fail without cascading the exception
+        cmd = "apt-get update -y && apt-get install -y cloud-guest-utils || true"
+        await execute_lxc("lxc", "exec", container_name, "--", "bash", "-lc", cmd, timeout=240, long_running=True)
+    except Exception as e:
+        logger.warning(f"Installing cloud-guest-utils may have failed in {container_name}: {e}")
+
+async def _guest_grow(container_name: str):
+    """Grow partition and filesystem up to the current quota (best-effort)."""
+    try:
+        # Allow commands to fail without cascading the exception
         cmd = (
-            "apt-get update -y && apt-get install -y cloud-guest-utils || true; "
             "growpart /dev/sda 1 || true; "
             "if command -v resize2fs >/dev/null 2>&1; then resize2fs /dev/sda1 || true; fi; "
             "if command -v xfs_growfs >/dev/null 2>&1; then xfs_growfs / || true; fi"
         )
-        await execute_lxc(f"lxc exec {container_name} -- bash -lc \"{cmd}\"", timeout=240)
+        await execute_lxc("lxc", "exec", container_name, "--", "bash", "-lc", cmd, timeout=120, long_running=True)
     except Exception as e:
         logger.warning(f"Automatic filesystem grow may have failed in {container_name}: {e}")
 
+async def set_root_disk_size(container_name: str, size_gb: int):
+    """Set LXD root disk size (best-effort) and try to grow filesystem inside container.
+       This assumes Linux inside container uses /dev/sda and ext4. Debian images usually fit."""
+    # The host quota and the in-container package install are independent, so overlap them;
+    # growing the filesystem has to wait until the new quota is in place.
+    prepare = asyncio.ensure_future(_guest_prepare(container_name))
+    try:
+        await _host_resize(container_name, size_gb)
+    except BaseException:
+        # Don't leave the install running (and holding an lxc permit) once the resize has failed
+        prepare.cancel()
+        await asyncio.gather(prepare, return_exceptions=True)
+        raise
+    await prepare
+    await _guest_grow(container_name)
+
 # ----------------- Core create function -----------------
 async def core_create_container(container_name: str, ram_gb: int, cpu: int, storage_gb: int, storage_pool: str = 'btrpool'):
     """Create a container on given pool, apply RAM/CPU, then set root disk size."""
     ram_mb = int(ram_gb) * 1024
     # Launch Debian 12 container
-    await execute_lxc(f"lxc launch images:debian/12 {container_name} --config limits.memory={ram_mb}MB --config limits.cpu={cpu} -s {storage_pool}")
+    await execute_lxc("lxc", "launch", "images:debian/12", container_name,
+                      "--config", f"limits.memory={ram_mb}MB", "--config", f"limits.cpu={cpu}", "-s", storage_pool, long_running=True)
     # Try to set root disk size and grow filesystem inside container
     await set_root_disk_size(container_name, storage_gb)
 
+# ----------------- SSH (tmate) -----------------
+# One in-container round trip: install tmate if missing, start a session and
+# poll until it reports its SSH address, which is printed as the last line.
+TMATE_SCRIPT = (
+    "command -v tmate >/dev/null 2>&1 || (apt-get update -y && apt-get install -y tmate) >/dev/null; "
+    "tmate -S {sock} new-session -d || exit 1; "
+    "for i in 1 2 3 4 5; do "
+    "u=$(tmate -S {sock} display -p '#{{tmate_ssh}}'); "
+    "[ -n \"$u\" ] && echo \"$u\" && exit 0; "
+    "sleep 1; "
+    "done; "
+    "echo 'tmate did not report an SSH address' >&2; exit 1"
+)
+
+# ----------------- Reinstall confirmation -----------------
+class ReinstallConfirmView(discord.ui.View):
+    def __init__(self, parent_view, container_name, vps, owner_id, selected_index):
+        super().__init__(timeout=60)
+        self.parent_view = parent_view
+        self.container_name = container_name
+        self.vps = vps
+        self.owner_id = owner_id
+        self.selected_index = selected_index
+
+    @discord.ui.button(label="Confirm", style=discord.ButtonStyle.danger)
+    async def confirm(self, interaction: discord.Interaction, item: discord.ui.Button):
+        await interaction.response.defer(ephemeral=True)
+        try:
+            await interaction.followup.send(embed=create_info_embed("Deleting Container", f"Forcefully removing container `{self.container_name}`..."), ephemeral=True)
+            await execute_lxc("lxc", "delete", self.container_name, "--force")
+
+            await interaction.followup.send(embed=create_info_embed("Recreating Container", f"Creating new container `{self.container_name}`..."), ephemeral=True)
+            await execute_lxc("lxc", "launch", "images:debian/12", self.container_name,
+                              "--config", f"limits.memory={self.vps['ram_mb']}MB", "--config", f"limits.cpu={self.vps['cpu_cores']}", "-s", "btrpool", long_running=True)
+            await set_root_disk_size(self.container_name, self.vps["storage_gb"])
+
+            set_vps_status(self.vps, "running")
+            self.vps["created_at"] = datetime.now().isoformat()
+            save_vps()
+            await interaction.followup.send(embed=create_success_embed("Reinstall Complete", f"VPS `{self.container_name}` has been successfully reinstalled!"), ephemeral=True)
+
+            if not self.parent_view.is_shared:
+                await interaction.message.edit(embed=self.parent_view.create_vps_embed(self.parent_view.selected_index), view=self.parent_view)
+
+        except Exception as e:
+            await interaction.followup.send(embed=create_error_embed("Reinstall Failed", f"Error: {str(e)}"), ephemeral=True)
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction: discord.Interaction, item: discord.ui.Button):
+        await interaction.response.edit_message(embed=self.parent_view.create_vps_embed(self.parent_view.selected_index), view=self.parent_view)
+
 # ----------------- Manage UI (shortened for clarity but functional) -----------------
 class ManageView(discord.ui.View):
     def __init__(self, user_id, vps_list, is_shared=False, owner_id=None, is_admin=False):
@@ -240,18 +800,21 @@ class ManageView(discord.ui.View):
         self.is_admin = is_admin
 
         if len(vps_list) > 1:
-            options = [
-                discord.SelectOption(
+            options = []
+            lines = []
+            for i, v in enumerate(vps_list):
+                status = cached_status(v)
+                options.append(discord.SelectOption(
                     label=f"VPS {i+1} ({v.get('plan', 'Custom')})",
-                    description=f"Status: {v.get('status', 'unknown')}",
+                    description=f"Status: {status}",
                     value=str(i)
-                ) for i, v in enumerate(vps_list)
-            ]
+                ))
+                lines.append(f"**VPS {i+1}:** `{v['container_name']}` - Status: `{status.upper()}`")
             self.select = discord.ui.Select(placeholder="Select a VPS to manage", options=options)
             self.select.callback = self.select_vps
             self.add_item(self.select)
-            self.initial_embed = create_embed("VPS Management", "Select a VPS from the dropdown menu below.", 0x1a1a1a)
-            self.initial_embed.add_field(name="Available VPS", value="\n".join([f"**VPS {i+1}:** `{v['container_name']}` - Status: `{v.get('status', 'unknown').upper()}`" for i, v in enumerate(vps_list)]), inline=False)
+            self.initial_embed = create_embed("VPS Management", "Select a VPS from the dropdown menu below.", _DEFAULT_COLOR)
+            self.initial_embed.add_field(name="Available VPS", value="\n".join(lines), inline=False)
         else:
             self.selected_index = 0
             self.initial_embed = self.create_vps_embed(0)
@@ -259,15 +822,12 @@ class ManageView(discord.ui.View):
 
     def create_vps_embed(self, index):
         vps = self.vps_list[index]
-        status_color = 0x00ff88 if vps.get('status') == 'running' else 0xff3366
+        status = cached_status(vps)
+        status_color = _SUCCESS_COLOR if status == 'running' else _ERROR_COLOR
 
         owner_text = ""
         if self.is_admin and self.owner_id != self.user_id:
-            try:
-                owner_user = bot.get_user(int(self.owner_id))
-                owner_text = f"\n**Owner:** {owner_user.mention}"
-            except:
-                owner_text = f"\n**Owner ID:** {self.owner_id}"
+            owner_text = f"\n**Owner:** <@{self.owner_id}>"
 
         embed = create_embed(
             f"VPS Management - VPS {index + 1}",
@@ -276,7 +836,7 @@ class ManageView(discord.ui.View):
         )
 
         resource_info = f"**Plan:** {vps.get('plan', 'Custom')}\n"
-        resource_info += f"**Status:** `{vps.get('status', 'unknown').upper()}`\n"
+        resource_info += f"**Status:** `{status.upper()}`\n"
         resource_info += f"**RAM:** {vps['ram']}\n"
         resource_info += f"**CPU:** {vps['cpu']} Cores\n"
         resource_info += f"**Storage:** {vps['storage']}"
@@ -312,10 +872,13 @@ class ManageView(discord.ui.View):
             await interaction.response.send_message(embed=create_error_embed("Access Denied", "This is not your VPS!"), ephemeral=True)
             return
         self.selected_index = int(self.select.values[0])
+        # Acknowledge first so the status lookup can't run past the 3 second deadline
+        await interaction.response.defer()
+        await refresh_statuses([self.vps_list[self.selected_index]['container_name']], timeout=10)
         new_embed = self.create_vps_embed(self.selected_index)
         self.clear_items()
         self.add_action_buttons()
-        await interaction.response.edit_message(embed=new_embed, view=self)
+        await interaction.edit_original_response(embed=new_embed, view=self)
 
     async def action_callback(self, interaction: discord.Interaction, action: str):
         if str(interaction.user.id) != self.user_id and not self.is_admin:
@@ -338,54 +901,14 @@ class ManageView(discord.ui.View):
                 f"⚠️ **WARNING:** This will erase all data on VPS `{container_name}` and reinstall Debian 12.\n\n"
                 f"This action cannot be undone. Continue?")
 
-            class ConfirmView(discord.ui.View):
-                def __init__(self, parent_view, container_name, vps, owner_id, selected_index):
-                    super().__init__(timeout=60)
-                    self.parent_view = parent_view
-                    self.container_name = container_name
-                    self.vps = vps
-                    self.owner_id = owner_id
-                    self.selected_index = selected_index
-
-                @discord.ui.button(label="Confirm", style=discord.ButtonStyle.danger)
-                async def confirm(self, interaction: discord.Interaction, item: discord.ui.Button):
-                    await interaction.response.defer(ephemeral=True)
-                    try:
-                        await interaction.followup.send(embed=create_info_embed("Deleting Container", f"Forcefully removing container `{self.container_name}`..."), ephemeral=True)
-                        await execute_lxc(f"lxc delete {self.container_name} --force")
-
-                        await interaction.followup.send(embed=create_info_embed("Recreating Container", f"Creating new container `{self.container_name}`..."), ephemeral=True)
-                        original_ram = self.vps["ram"]
-                        original_cpu = self.vps["cpu"]
-                        original_storage = self.vps.get("storage", "10GB")
-                        ram_mb = int(original_ram.replace("GB", "")) * 1024
-                        storage_gb = int(original_storage.replace("GB", ""))
-                        await execute_lxc(f"lxc launch images:debian/12 {self.container_name} --config limits.memory={ram_mb}MB --config limits.cpu={original_cpu} -s btrpool")
-                        await set_root_disk_size(self.container_name, storage_gb)
-
-                        self.vps["status"] = "running"
-                        self.vps["created_at"] = datetime.now().isoformat()
-                        save_data()
-                        await interaction.followup.send(embed=create_success_embed("Reinstall Complete", f"VPS `{self.container_name}` has been successfully reinstalled!"), ephemeral=True)
-
-                        if not self.parent_view.is_shared:
-                            await interaction.message.edit(embed=self.parent_view.create_vps_embed(self.parent_view.selected_index), view=self.parent_view)
-
-                    except Exception as e:
-                        await interaction.followup.send(embed=create_error_embed("Reinstall Failed", f"Error: {str(e)}"), ephemeral=True)
-
-                @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
-                async def cancel(self, interaction: discord.Interaction, item: discord.ui.Button):
-                    await interaction.response.edit_message(embed=self.parent_view.create_vps_embed(self.parent_view.selected_index), view=self.parent_view)
-
-            await interaction.response.send_message(embed=confirm_embed, view=ConfirmView(self, container_name, vps, self.owner_id, self.selected_index), ephemeral=True)
+            await interaction.response.send_message(embed=confirm_embed, view=ReinstallConfirmView(self, container_name, vps, self.owner_id, self.selected_index), ephemeral=True)
 
         elif action == 'start':
             await interaction.response.defer(ephemeral=True)
             try:
-                await execute_lxc(f"lxc start {container_name}")
-                vps["status"] = "running"
-                save_data()
+                await execute_lxc("lxc", "start", container_name)
+                set_vps_status(vps, "running")
+                save_vps()
                 await interaction.followup.send(embed=create_success_embed("VPS Started", f"VPS `{container_name}` is now running!"), ephemeral=True)
                 await interaction.message.edit(embed=self.create_vps_embed(self.selected_index), view=self)
             except Exception as e:
@@ -394,9 +917,9 @@ class ManageView(discord.ui.View):
         elif action == 'stop':
             await interaction.response.defer(ephemeral=True)
             try:
-                await execute_lxc(f"lxc stop {container_name}", timeout=120)
-                vps["status"] = "stopped"
-                save_data()
+                await execute_lxc("lxc", "stop", container_name, timeout=120)
+                set_vps_status(vps, "stopped")
+                save_vps()
                 await interaction.followup.send(embed=create_success_embed("VPS Stopped", f"VPS `{container_name}` has been stopped!"), ephemeral=True)
                 await interaction.message.edit(embed=self.create_vps_embed(self.selected_index), view=self)
             except Exception as e:
@@ -406,35 +929,14 @@ class ManageView(discord.ui.View):
             await interaction.response.send_message(embed=create_info_embed("SSH Access", "Generating SSH connection..."), ephemeral=True)
 
             try:
-                # Check if tmate exists
-                check_proc = await asyncio.create_subprocess_exec(
-                    "lxc", "exec", container_name, "--", "which", "tmate",
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                stdout, stderr = await check_proc.communicate()
-
-                if check_proc.returncode != 0:
-                    await interaction.followup.send(embed=create_info_embed("Installing SSH", "Installing tmate..."), ephemeral=True)
-                    await execute_lxc(f"lxc exec {container_name} -- apt-get update -y")
-                    await execute_lxc(f"lxc exec {container_name} -- apt-get install -y tmate")
-                    await interaction.followup.send(embed=create_success_embed("Installed", "SSH service installed!"), ephemeral=True)
-
-                session_name = f"session-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-                await execute_lxc(f"lxc exec {container_name} -- tmate -S /tmp/{session_name}.sock new-session -d")
-                await asyncio.sleep(3)
-
-                ssh_proc = await asyncio.create_subprocess_exec(
-                    "lxc", "exec", container_name, "--", "tmate", "-S", f"/tmp/{session_name}.sock", "display", "-p", "#{tmate_ssh}",
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                stdout, stderr = await ssh_proc.communicate()
-                ssh_url = stdout.decode().strip() if stdout else None
+                session_name = f"session-{int(time.time() * 1000):x}"
+                result = await execute_lxc("lxc", "exec", container_name, "--", "bash", "-lc",
+                                           TMATE_SCRIPT.format(sock=f"/tmp/{session_name}.sock"), timeout=180, long_running=True)
+                ssh_url = result.splitlines()[-1].strip() if isinstance(result, str) else None
 
                 if ssh_url:
                     try:
-                        ssh_embed = create_embed("🔑 SSH Access", f"SSH connection for VPS `{container_name}`:", 0x00ff88)
+                        ssh_embed = create_embed("🔑 SSH Access", f"SSH connection for VPS `{container_name}`:", _SUCCESS_COLOR)
                         ssh_embed.add_field(name="Command", value=f"```{ssh_url}```", inline=False)
                         ssh_embed.add_field(name="⚠️ Security", value="This link is temporary. Do not share it.", inline=False)
                         ssh_embed.add_field(name="📝 Session", value=f"Session ID: {session_name}", inline=False)
@@ -443,8 +945,7 @@ class ManageView(discord.ui.View):
                     except discord.Forbidden:
                         await interaction.followup.send(embed=create_error_embed("DM Failed", "Enable DMs to receive SSH link!"), ephemeral=True)
                 else:
-                    error_msg = stderr.decode().strip() if stderr else "Unknown error"
-                    await interaction.followup.send(embed=create_error_embed("SSH Failed", error_msg), ephemeral=True)
+                    await interaction.followup.send(embed=create_error_embed("SSH Failed", "tmate did not return an SSH address."), ephemeral=True)
             except Exception as e:
                 await interaction.followup.send(embed=create_error_embed("SSH Error", str(e)), ephemeral=True)
 
@@ -458,14 +959,10 @@ async def create_vps(ctx, user: discord.Member, ram: int, cpu: int, storage: int
         return
 
     user_id = str(user.id)
-    if user_id not in vps_data:
-        vps_data[user_id] = []
-
-    vps_count = len(vps_data[user_id]) + 1
-    container_name = f"vps-{user_id}-{vps_count}"
 
     await ctx.send(embed=create_info_embed("Creating VPS", f"Deploying VPS for {user.mention}..."))
 
+    container_name = new_container_name(user_id)
     try:
         await core_create_container(container_name, ram, cpu, storage)
 
@@ -474,13 +971,16 @@ async def create_vps(ctx, user: discord.Member, ram: int, cpu: int, storage: int
             "ram": f"{ram}GB",
             "cpu": str(cpu),
             "storage": f"{storage}GB",
+            "ram_mb": ram * 1024,
+            "cpu_cores": cpu,
+            "storage_gb": storage,
             "status": "running",
             "created_at": datetime.now().isoformat(),
-            "shared_with": [],
+            "shared_with": set(),
             "protected": False
         }
-        vps_data[user_id].append(vps_info)
-        save_data()
+        vps_count = add_vps_record(user_id, vps_info)
+        save_vps()
 
         # Get or create VPS role and assign to user
         if ctx.guild:
@@ -508,6 +1008,8 @@ async def create_vps(ctx, user: discord.Member, ram: int, cpu: int, storage: int
 
     except Exception as e:
         await ctx.send(embed=create_error_embed("Creation Failed", f"Error: {str(e)}"))
+    finally:
+        pending_container_names.discard(container_name)
 
 async def get_or_create_vps_role(guild):
     """Get or create the VPS User role"""
@@ -563,11 +1065,6 @@ async def buy_with_credits(ctx, plan: str, processor: str = "Intel", storage: Op
 
     user_data[user_id]["credits"] -= cost
 
-    if user_id not in vps_data:
-        vps_data[user_id] = []
-    vps_count = len(vps_data[user_id]) + 1
-    container_name = f"vps-{user_id}-{vps_count}"
-
     plan_spec = PLANS[plan]
     ram_str = plan_spec["ram"]
     cpu_str = plan_spec["cpu"]
@@ -577,6 +1074,7 @@ async def buy_with_credits(ctx, plan: str, processor: str = "Intel", storage: Op
 
     await ctx.send(embed=create_info_embed("Processing Purchase", f"Deploying {plan} VPS..."))
 
+    container_name = new_container_name(user_id)
     try:
         await core_create_container(container_name, ram_gb, int(cpu_str), storage_gb)
 
@@ -586,14 +1084,18 @@ async def buy_with_credits(ctx, plan: str, processor: str = "Intel", storage: Op
             "ram": ram_str,
             "cpu": cpu_str,
             "storage": f"{storage_gb}GB",
+            "ram_mb": ram_gb * 1024,
+            "cpu_cores": int(cpu_str),
+            "storage_gb": storage_gb,
             "status": "running",
             "created_at": datetime.now().isoformat(),
             "processor": processor_key,
-            "shared_with": [],
+            "shared_with": set(),
             "protected": False
         }
-        vps_data[user_id].append(vps_info)
-        save_data()
+        vps_count = add_vps_record(user_id, vps_info)
+        save_users()
+        save_vps()
 
         if ctx.guild:
             vps_role = await get_or_create_vps_role(ctx.guild)
@@ -622,25 +1124,51 @@ async def buy_with_credits(ctx, plan: str, processor: str = "Intel", storage: Op
     except Exception as e:
         # Refund credits on failure
         user_data[user_id]["credits"] += cost
-        save_data()
+        save_users()
         await ctx.send(embed=create_error_embed("Purchase Failed", f"Error: {str(e)}"))
+    finally:
+        pending_container_names.discard(container_name)
+
+# Field specs for .buyc; each call builds a fresh embed (and fresh field dicts) with the current footer
+_BUYC_FIELDS = (
+    {"name": "🇮🇳 UPI", "value": "```\n9526303242@fam\n```", "inline": False},
+    {"name": "💰 PayPal", "value": "```\nexample@paypal.com\n```", "inline": False},
+    {"name": "₿ Crypto", "value": "BTC, ETH, USDT accepted", "inline": False},
+    {"name": "📋 Next Steps", "value": "1. Pay\n2. Contact admin with transaction ID\n3. Receive credits", "inline": False},
+)
+
+def _build_buyc_embed():
+    embed = create_embed("💳 Purchase Credits", "Choose your payment method below:", _DEFAULT_COLOR)
+    for spec in _BUYC_FIELDS:
+        embed.add_field(**spec)
+    return embed
 
-@bot.command(name='buyc')
-async def buy_credits(ctx):
-    """Get payment information"""
-    user = ctx.author
-    embed = create_embed("💳 Purchase Credits", "Choose your payment method below:", 0x1a1a1a)
+def _build_plans_embed():
+    embed = create_embed("💎 VPS Plans - KEXSON HOSTS V1", "Choose your perfect VPS plan:", _DEFAULT_COLOR)
 
-    payment_fields = [
-        {"name": "🇮🇳 UPI", "value": "```\n9526303242@fam\n```", "inline": False},
-        {"name": "💰 PayPal", "value": "```\nexample@paypal.com\n```", "inline": False},
-        {"name": "₿ Crypto", "value": "BTC, ETH, USDT accepted", "inline": False},
-        {"name": "📋 Next Steps", "value": "1. Pay\n2. Contact admin with transaction ID\n3. Receive credits", "inline": False}
+    plan_fields = [
+        {"name": "🚀 Starter", "value": f"**RAM:** {PLANS['Starter']['ram']}\n**CPU:** {PLANS['Starter']['cpu']} Core\n**Storage:** {PLANS['Starter']['storage']} GB\n━━━━━━━━━━━━━━\n**Intel:** ₹{PRICES['Starter']['Intel']} | **AMD:** ₹{PRICES['Starter']['AMD']}", "inline": False},
+        {"name": "⚡ Basic", "value": f"**RAM:** {PLANS['Basic']['ram']}\n**CPU:** {PLANS['Basic']['cpu']} Core\n**Storage:** {PLANS['Basic']['storage']} GB\n━━━━━━━━━━━━━━\n**Intel:** ₹{PRICES['Basic']['Intel']} | **AMD:** ₹{PRICES['Basic']['AMD']}", "inline": False},
+        {"name": "🔥 Standard", "value": f"**RAM:** {PLANS['Standard']['ram']}\n**CPU:** {PLANS['Standard']['cpu']} Cores\n**Storage:** {PLANS['Standard']['storage']} GB\n━━━━━━━━━━━━━━\n**Intel:** ₹{PRICES['Standard']['Intel']} | **AMD:** ₹{PRICES['Standard']['AMD']}", "inline": False},
+        {"name": "💎 Pro", "value": f"**RAM:** {PLANS['Pro']['ram']}\n**CPU:** {PLANS['Pro']['cpu']} Cores\n**Storage:** {PLANS['Pro']['storage']} GB\n━━━━━━━━━━━━━━\n**Intel:** ₹{PRICES['Pro']['Intel']} | **AMD:** ₹{PRICES['Pro']['AMD']}", "inline": False}
     ]
 
-    for field in payment_fields:
+    for field in plan_fields:
         embed.add_field(**field)
 
+    embed.add_field(name="🛒 Purchase", value="Use `.buywc <plan> <processor> [storage_GB]`\nExample: `.buywc Starter Intel`", inline=False)
+    embed.set_footer(text="All plans include Debian 12 • Full root access")
+    return embed
+
+# Static content, built once at import. discord.py only reads an embed when sending it.
+_PLANS_EMBED = _build_plans_embed()
+
+@bot.command(name='buyc')
+async def buy_credits(ctx):
+    """Get payment information"""
+    user = ctx.author
+    embed = _build_buyc_embed()
+
     try:
         await user.send(embed=embed)
         await ctx.send(embed=create_success_embed("Information Sent", "Payment details sent to your DMs!"))
@@ -650,28 +1178,15 @@ async def buy_credits(ctx):
 @bot.command(name='plans')
 async def show_plans(ctx):
     """Show available VPS plans"""
-    embed = create_embed("💎 VPS Plans - KEXSON HOSTS V1", "Choose your perfect VPS plan:", 0x1a1a1a)
-
-    plan_fields = [
-        {"name": "🚀 Starter", "value": f"**RAM:** {PLANS['Starter']['ram']}\n**CPU:** {PLANS['Starter']['cpu']} Core\n**Storage:** {PLANS['Starter']['storage']} GB\n━━━━━━━━━━━━━━\n**Intel:** ₹{PRICES['Starter']['Intel']} | **AMD:** ₹{PRICES['Starter']['AMD']}", "inline": False},
-        {"name": "⚡ Basic", "value": f"**RAM:** {PLANS['Basic']['ram']}\n**CPU:** {PLANS['Basic']['cpu']} Core\n**Storage:** {PLANS['Basic']['storage']} GB\n━━━━━━━━━━━━━━\n**Intel:** ₹{PRICES['Basic']['Intel']} | **AMD:** ₹{PRICES['Basic']['AMD']}", "inline": False},
-        {"name": "🔥 Standard", "value": f"**RAM:** {PLANS['Standard']['ram']}\n**CPU:** {PLANS['Standard']['cpu']} Cores\n**Storage:** {PLANS['Standard']['storage']} GB\n━━━━━━━━━━━━━━\n**Intel:** ₹{PRICES['Standard']['Intel']} | **AMD:** ₹{PRICES['Standard']['AMD']}", "inline": False},
-        {"name": "💎 Pro", "value": f"**RAM:** {PLANS['Pro']['ram']}\n**CPU:** {PLANS['Pro']['cpu']} Cores\n**Storage:** {PLANS['Pro']['storage']} GB\n━━━━━━━━━━━━━━\n**Intel:** ₹{PRICES['Pro']['Intel']} | **AMD:** ₹{PRICES['Pro']['AMD']}", "inline": False}
-    ]
-
-    for field in plan_fields:
-        embed.add_field(**field)
-
-    embed.add_field(name="🛒 Purchase", value="Use `.buywc <plan> <processor> [storage_GB]`\nExample: `.buywc Starter Intel`", inline=False)
-    embed.set_footer(text="All plans include Debian 12 • Full root access")
-    await ctx.send(embed=embed)
+    await ctx.send(embed=_PLANS_EMBED)
 
 # ----------------- Manage, sharing, delete, admin functions -----------------
 @bot.command(name='manage')
 async def manage_vps(ctx, user: discord.Member = None):
     """Manage your VPS or another user's VPS (Admin only)"""
+    author_id = str(ctx.author.id)
     if user:
-        if not (str(ctx.author.id) == str(MAIN_ADMIN_ID) or str(ctx.author.id) in admin_data.get("admins", [])):
+        if not _is_admin(author_id):
             await ctx.send(embed=create_error_embed("Access Denied", "Only admins can manage other users' VPS."))
             return
 
@@ -681,16 +1196,18 @@ async def manage_vps(ctx, user: discord.Member = None):
             await ctx.send(embed=create_error_embed("No VPS Found", f"{user.mention} doesn't have any VPS."))
             return
 
-        view = ManageView(str(ctx.author.id), vps_list, is_admin=True, owner_id=user_id)
+        await refresh_statuses([v['container_name'] for v in vps_list])
+        view = ManageView(author_id, vps_list, is_admin=True, owner_id=user_id)
         await ctx.send(embed=create_info_embed(f"Managing {user.name}'s VPS", f"Managing VPS for {user.mention}"), view=view)
     else:
-        user_id = str(ctx.author.id)
+        user_id = author_id
         vps_list = vps_data.get(user_id, [])
         if not vps_list:
-            embed = create_embed("No VPS Found", "You don't have any VPS. Use `.buywc` to purchase one.", 0xff3366)
+            embed = create_embed("No VPS Found", "You don't have any VPS. Use `.buywc` to purchase one.", _ERROR_COLOR)
             embed.add_field(name="Quick Actions", value="• `.plans` - View plans\n• `.buywc <plan> <processor>` - Purchase VPS", inline=False)
             await ctx.send(embed=embed)
             return
+        await refresh_statuses([v['container_name'] for v in vps_list])
         view = ManageView(user_id, vps_list)
         await ctx.send(embed=view.initial_embed, view=view)
 
@@ -705,16 +1222,16 @@ async def share_user(ctx, shared_user: discord.Member, vps_number: int):
     vps = vps_data[user_id][vps_number - 1]
 
     if "shared_with" not in vps:
-        vps["shared_with"] = []
+        vps["shared_with"] = set()
 
     if shared_user_id in vps["shared_with"]:
         await ctx.send(embed=create_error_embed("Already Shared", f"{shared_user.mention} already has access!"))
         return
-    vps["shared_with"].append(shared_user_id)
-    save_data()
+    vps["shared_with"].add(shared_user_id)
+    save_vps()
     await ctx.send(embed=create_success_embed("VPS Shared", f"VPS #{vps_number} shared with {shared_user.mention}!"))
     try:
-        await shared_user.send(embed=create_embed("VPS Access Granted", f"You have access to VPS #{vps_number} from {ctx.author.mention}. Use `.manage-shared {ctx.author.mention} {vps_number}`", 0x00ff88))
+        await shared_user.send(embed=create_embed("VPS Access Granted", f"You have access to VPS #{vps_number} from {ctx.author.mention}. Use `.manage-shared {ctx.author.mention} {vps_number}`", _SUCCESS_COLOR))
     except discord.Forbidden:
         await ctx.send(embed=create_info_embed("Notification Failed", f"Could not DM {shared_user.mention}"))
 
@@ -729,16 +1246,16 @@ async def revoke_share(ctx, shared_user: discord.Member, vps_number: int):
     vps = vps_data[user_id][vps_number - 1]
 
     if "shared_with" not in vps:
-        vps["shared_with"] = []
+        vps["shared_with"] = set()
 
     if shared_user_id not in vps["shared_with"]:
         await ctx.send(embed=create_error_embed("Not Shared", f"{shared_user.mention} doesn't have access!"))
         return
-    vps["shared_with"].remove(shared_user_id)
-    save_data()
+    vps["shared_with"].discard(shared_user_id)
+    save_vps()
     await ctx.send(embed=create_success_embed("Access Revoked", f"Access to VPS #{vps_number} revoked from {shared_user.mention}!"))
     try:
-        await shared_user.send(embed=create_embed("VPS Access Revoked", f"Your access to VPS #{vps_number} by {ctx.author.mention} has been revoked.", 0xff3366))
+        await shared_user.send(embed=create_embed("VPS Access Revoked", f"Your access to VPS #{vps_number} by {ctx.author.mention} has been revoked.", _ERROR_COLOR))
     except discord.Forbidden:
         await ctx.send(embed=create_info_embed("Notification Failed", f"Could not DM {shared_user.mention}"))
 
@@ -751,9 +1268,10 @@ async def manage_shared_vps(ctx, owner: discord.Member, vps_number: int):
         await ctx.send(embed=create_error_embed("Invalid VPS", "Invalid VPS number or owner doesn't have a VPS."))
         return
     vps = vps_data[owner_id][vps_number - 1]
-    if user_id not in vps.get("shared_with", []):
+    if user_id not in vps.get("shared_with", ()):
         await ctx.send(embed=create_error_embed("Access Denied", "You do not have access to this VPS."))
         return
+    await refresh_statuses([vps['container_name']])
     view = ManageView(user_id, [vps], is_shared=True, owner_id=owner_id)
     await ctx.send(embed=view.initial_embed, view=view)
 
@@ -771,10 +1289,9 @@ async def delete_vps(ctx, user: discord.Member, vps_number: int, *, reason: str
     await ctx.send(embed=create_info_embed("Deleting VPS", f"Removing VPS #{vps_number}..."))
 
     try:
-        await execute_lxc(f"lxc delete {container_name} --force")
-        del vps_data[user_id][vps_number - 1]
-        if not vps_data[user_id]:
-            del vps_data[user_id]
+        await execute_lxc("lxc", "delete", container_name, "--force")
+        remove_vps_record(user_id, vps_number - 1)
+        if user_id not in vps_data:
             if ctx.guild:
                 vps_role = await get_or_create_vps_role(ctx.guild)
                 if vps_role:
@@ -782,7 +1299,7 @@ async def delete_vps(ctx, user: discord.Member, vps_number: int, *, reason: str
                         await user.remove_roles(vps_role, reason="No VPS ownership")
                     except discord.Forbidden:
                         logger.warning(f"Failed to remove VPS role from {user.name}")
-        save_data()
+        save_vps()
 
         embed = create_success_embed("VPS Deleted Successfully")
         embed.add_field(name="Owner", value=user.mention, inline=True)
@@ -798,48 +1315,46 @@ async def delete_vps(ctx, user: discord.Member, vps_number: int, *, reason: str
 @is_admin()
 async def list_all_vps(ctx):
     """List all VPS and user information (Admin only)"""
-    embed = create_embed("All VPS Information", "Complete overview of all VPS deployments and user statistics", 0x1a1a1a)
+    embed = create_embed("All VPS Information", "Complete overview of all VPS deployments and user statistics", _DEFAULT_COLOR)
 
-    total_vps = 0
-    total_users = len(vps_data)
     running_vps = 0
     stopped_vps = 0
 
     vps_info = []
     user_summary = []
 
-    for user_id, vps_list in vps_data.items():
-        try:
-            user = await bot.fetch_user(int(user_id))
-            user_vps_count = len(vps_list)
-            user_running = sum(1 for vps in vps_list if vps.get('status') == 'running')
-            user_stopped = user_vps_count - user_running
-
-            total_vps += user_vps_count
-            running_vps += user_running
-            stopped_vps += user_stopped
-
-            user_summary.append(f"**{user.name}** ({user.mention}) - {user_vps_count} VPS ({user_running} running)")
-
-            for i, vps in enumerate(vps_list):
-                status_emoji = "🟢" if vps.get('status') == 'running' else "🔴"
-                vps_info.append(f"{status_emoji} **{user.name}** - VPS {i+1}: `{vps['container_name']}` - {vps.get('plan', 'Custom')} - {vps.get('status', 'unknown').upper()}")
-
-        except discord.NotFound:
+    owners = list(vps_data.items())
+    users = await asyncio.gather(*(get_user_cached(int(user_id)) for user_id, _ in owners), return_exceptions=True)
+    # Single walk: tally every VPS (unknown owners included) and build the display lines as we go
+    for (user_id, vps_list), user in zip(owners, users):
+        known = not isinstance(user, Exception)
+        user_running = 0
+        for i, vps in enumerate(vps_list):
+            status = vps.get('status', 'unknown')
+            if status == 'running':
+                user_running += 1
+            if known:
+                status_emoji, label = status_display(status)
+                vps_info.append(f"{status_emoji} **{user.name}** - VPS {i+1}: `{vps['container_name']}` - {vps.get('plan', 'Custom')} - {label}")
+        running_vps += user_running
+        stopped_vps += len(vps_list) - user_running
+
+        if known:
+            user_summary.append(f"**{user.name}** ({user.mention}) - {len(vps_list)} VPS ({user_running} running)")
+        else:
             vps_info.append(f"❓ Unknown User ({user_id}) - {len(vps_list)} VPS")
 
+    total_users = len(owners)
+    total_vps = running_vps + stopped_vps
+
     embed.add_field(name="System Overview", value=f"**Total Users:** {total_users}\n**Total VPS:** {total_vps}\n**Running:** {running_vps}\n**Stopped:** {stopped_vps}", inline=False)
 
     if user_summary:
-        embed.add_field(name="User Summary", value="\n".join(user_summary[:10]), inline=False)
+        embed.add_field(name="User Summary", value="\n".join(islice(user_summary, 10)), inline=False)
         if len(user_summary) > 10:
             embed.add_field(name="Additional Users", value=f"... and {len(user_summary) - 10} more users", inline=False)
 
-    if vps_info:
-        chunk_size = 15
-        for i in range(0, min(len(vps_info), 30), chunk_size):
-            chunk = vps_info[i:i+chunk_size]
-            embed.add_field(name=f"VPS Deployments ({i+1}-{min(i+chunk_size, len(vps_info))})", value="\n".join(chunk), inline=False)
+    add_line_fields(embed, "VPS Deployments", vps_info, 15, max_lines=30)
 
     if len(vps_info) > 30:
         embed.add_field(name="Additional VPS", value=f"... and {len(vps_info) - 30} more VPS deployments", inline=False)
@@ -852,53 +1367,42 @@ async def vps_info(ctx, container_name: str = None):
     """Get detailed VPS information (Admin only)"""
     if not container_name:
         all_vps = []
-        for user_id, vps_list in vps_data.items():
-            try:
-                user = await bot.fetch_user(int(user_id))
-                for i, vps in enumerate(vps_list):
-                    all_vps.append(f"**{user.name}** - VPS {i+1}: `{vps['container_name']}` - {vps.get('status', 'unknown').upper()}")
-            except:
-                pass
-
-        embed = create_embed("🖥️ All VPS", f"Total VPS: {len(all_vps)}", 0x1a1a1a)
-        chunk_size = 20
-        for i in range(0, len(all_vps), chunk_size):
-            chunk = all_vps[i:i+chunk_size]
-            embed.add_field(name=f"VPS List ({i+1}-{i+chunk_size})", value="\n".join(chunk), inline=False)
+        owners = list(vps_data.items())
+        users = await asyncio.gather(*(get_user_cached(int(user_id)) for user_id, _ in owners), return_exceptions=True)
+        for (user_id, vps_list), user in zip(owners, users):
+            if isinstance(user, Exception):
+                continue
+            for i, vps in enumerate(vps_list):
+                all_vps.append(f"**{user.name}** - VPS {i+1}: `{vps['container_name']}` - {vps.get('status', 'unknown').upper()}")
+
+        embed = create_embed("🖥️ All VPS", f"Total VPS: {len(all_vps)}", _DEFAULT_COLOR)
+        add_line_fields(embed, "VPS List", all_vps, 20)
         await ctx.send(embed=embed)
     else:
-        found_vps = None
-        found_user = None
-        for user_id, vps_list in vps_data.items():
-            for vps in vps_list:
-                if vps['container_name'] == container_name:
-                    found_vps = vps
-                    try:
-                        found_user = await bot.fetch_user(int(user_id))
-                    except:
-                        found_user = None
-                    break
-            if found_vps:
-                break
-
+        user_id, found_vps = find_vps(container_name)
         if not found_vps:
             await ctx.send(embed=create_error_embed("VPS Not Found", f"No VPS found with container name: `{container_name}`"))
             return
+        try:
+            found_user = await get_user_cached(int(user_id))
+        except:
+            found_user = None
 
-        embed = create_embed(f"🖥️ VPS Information - {container_name}", f"Details for VPS owned by {found_user.mention if found_user else 'Unknown'}", 0x1a1a1a)
+        embed = create_embed(f"🖥️ VPS Information - {container_name}", f"Details for VPS owned by {found_user.mention if found_user else 'Unknown'}", _DEFAULT_COLOR)
         embed.add_field(name="👤 Owner", value=f"**Name:** {found_user.name if found_user else 'Unknown'}\n**ID:** {found_user.id if found_user else 'Unknown'}", inline=False)
         embed.add_field(name="📊 Specifications", value=f"**RAM:** {found_vps['ram']}\n**CPU:** {found_vps['cpu']} Cores\n**Storage:** {found_vps['storage']}", inline=False)
         embed.add_field(name="📈 Status", value=f"**Current:** {found_vps.get('status', 'unknown').upper()}\n**Created:** {found_vps.get('created_at', 'Unknown')}", inline=False)
         if 'plan' in found_vps:
             embed.add_field(name="💎 Plan", value=f"**Plan:** {found_vps['plan']}\n**Processor:** {found_vps.get('processor', 'Unknown')}", inline=False)
         if found_vps.get('shared_with'):
+            shared_ids = sorted(found_vps['shared_with'])
+            results = await asyncio.gather(*(get_user_cached(int(shared_id)) for shared_id in shared_ids), return_exceptions=True)
             shared_users = []
-            for shared_id in found_vps['shared_with']:
-                try:
-                    shared_user = await bot.fetch_user(int(shared_id))
-                    shared_users.append(f"• {shared_user.mention}")
-                except:
+            for shared_id, shared_user in zip(shared_ids, results):
+                if isinstance(shared_user, Exception):
                     shared_users.append(f"• Unknown User ({shared_id})")
+                else:
+                    shared_users.append(f"• {shared_user.mention}")
             embed.add_field(name="🔗 Shared With", value="\n".join(shared_users), inline=False)
         await ctx.send(embed=embed)
 
@@ -908,13 +1412,11 @@ async def restart_vps(ctx, container_name: str):
     """Restart a VPS (Admin only)"""
     await ctx.send(embed=create_info_embed("Restarting VPS", f"Restarting VPS `{container_name}`..."))
     try:
-        await execute_lxc(f"lxc restart {container_name}")
-        for user_id, vps_list in vps_data.items():
-            for vps in vps_list:
-                if vps['container_name'] == container_name:
-                    vps['status'] = 'running'
-                    save_data()
-                    break
+        await execute_lxc("lxc", "restart", container_name)
+        _, vps = find_vps(container_name)
+        if vps:
+            set_vps_status(vps, 'running')
+            save_vps()
         await ctx.send(embed=create_success_embed("VPS Restarted", f"VPS `{container_name}` has been restarted successfully!"))
     except Exception as e:
         await ctx.send(embed=create_error_embed("Restart Failed", f"Error: {str(e)}"))
@@ -926,7 +1428,7 @@ async def backup_vps(ctx, container_name: str):
     snapshot_name = f"{container_name}-backup-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
     await ctx.send(embed=create_info_embed("Creating Backup", f"Creating snapshot of `{container_name}`..."))
     try:
-        await execute_lxc(f"lxc snapshot {container_name} {snapshot_name}")
+        await execute_lxc("lxc", "snapshot", container_name, snapshot_name)
         await ctx.send(embed=create_success_embed("Backup Created", f"Snapshot `{snapshot_name}` created successfully!"))
     except Exception as e:
         await ctx.send(embed=create_error_embed("Backup Failed", f"Error: {str(e)}"))
@@ -937,35 +1439,33 @@ async def restore_vps(ctx, container_name: str, snapshot_name: str):
     """Restore a VPS from snapshot (Admin only)"""
     await ctx.send(embed=create_info_embed("Restoring VPS", f"Restoring `{container_name}` from snapshot `{snapshot_name}`..."))
     try:
-        await execute_lxc(f"lxc restore {container_name} {snapshot_name}")
+        await execute_lxc("lxc", "restore", container_name, snapshot_name)
         await ctx.send(embed=create_success_embed("VPS Restored", f"VPS `{container_name}` has been restored from snapshot!"))
     except Exception as e:
         await ctx.send(embed=create_error_embed("Restore Failed", f"Error: {str(e)}"))
 
+_SNAP_RE = re.compile(rb'^[ \t]*snapshot:[ \t]*(\S+)', re.MULTILINE)
+
 @bot.command(name='list-snapshots')
 @is_admin()
 async def list_snapshots(ctx, container_name: str):
     """List all snapshots for a VPS (Admin only)"""
     try:
         proc = await asyncio.create_subprocess_exec(
-            "lxc", "info", container_name,
+            LXC_BIN, "info", container_name,
             stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+            stderr=asyncio.subprocess.PIPE,
+            **SPAWN_KWARGS
         )
         stdout, stderr = await proc.communicate()
         if proc.returncode != 0:
             await ctx.send(embed=create_error_embed("Error", f"Failed to get VPS info: {stderr.decode()}"))
             return
 
-        info = stdout.decode()
-        snapshots = []
-        for line in info.split('\n'):
-            if 'snapshot:' in line:
-                snapshot_name = line.split(':', 1)[1].strip()
-                snapshots.append(snapshot_name)
+        snapshots = [m.group(1).decode() for m in _SNAP_RE.finditer(stdout)]
 
         if snapshots:
-            embed = create_embed(f"📸 Snapshots for {container_name}", f"Found {len(snapshots)} snapshots", 0x1a1a1a)
+            embed = create_embed(f"📸 Snapshots for {container_name}", f"Found {len(snapshots)} snapshots", _DEFAULT_COLOR)
             embed.add_field(name="Snapshots", value="\n".join([f"• {snap}" for snap in snapshots]), inline=False)
             await ctx.send(embed=embed)
         else:
@@ -973,6 +1473,21 @@ async def list_snapshots(ctx, container_name: str):
     except Exception as e:
         await ctx.send(embed=create_error_embed("Error", f"Error: {str(e)}"))
 
+EXEC_OUTPUT_CAP = 2048  # Bytes read per stream; the embed shows at most 1000 characters
+
+async def read_capped(proc, stream, cap=EXEC_OUTPUT_CAP):
+    """Read up to cap bytes from stream. Kills proc once the cap is hit so a chatty
+       command can neither grow our buffer nor block forever on a full pipe."""
+    buf = bytearray()
+    while len(buf) < cap:
+        chunk = await stream.read(cap - len(buf))
+        if not chunk:
+            return bytes(buf)
+        buf += chunk
+    if proc.returncode is None:
+        proc.kill()
+    return bytes(buf)
+
 @bot.command(name='exec')
 @is_admin()
 async def execute_command(ctx, container_name: str, *, command: str):
@@ -980,14 +1495,16 @@ async def execute_command(ctx, container_name: str, *, command: str):
     await ctx.send(embed=create_info_embed("Executing Command", f"Running command in `{container_name}`..."))
     try:
         proc = await asyncio.create_subprocess_exec(
-            "lxc", "exec", container_name, "--", "bash", "-c", command,
+            LXC_BIN, "exec", container_name, "--", "bash", "-c", command,
             stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+            stderr=asyncio.subprocess.PIPE,
+            **SPAWN_KWARGS
         )
-        stdout, stderr = await proc.communicate()
-        output = stdout.decode() if stdout else "No output"
-        error = stderr.decode() if stderr else ""
-        embed = create_embed(f"Command Output - {container_name}", f"Command: `{command}`", 0x1a1a1a)
+        stdout, stderr = await asyncio.gather(read_capped(proc, proc.stdout), read_capped(proc, proc.stderr))
+        await proc.wait()
+        output = stdout.decode(errors='replace') if stdout else "No output"
+        error = stderr.decode(errors='replace') if stderr else ""
+        embed = create_embed(f"Command Output - {container_name}", f"Command: `{command}`", _DEFAULT_COLOR)
         if output.strip():
             if len(output) > 1000:
                 output = output[:1000] + "\n... (truncated)"
@@ -1011,38 +1528,31 @@ async def stop_all_vps(ctx):
         def __init__(self):
             super().__init__(timeout=60)
 
+        async def disable_buttons(self, interaction: discord.Interaction, **kwargs):
+            # Acknowledge by greying out both buttons so the prompt can't be confirmed twice
+            for child in self.children:
+                child.disabled = True
+            self.stop()
+            await interaction.response.edit_message(view=self, **kwargs)
+
         @discord.ui.button(label="Stop All VPS", style=discord.ButtonStyle.danger)
         async def confirm(self, interaction: discord.Interaction, item: discord.ui.Button):
-            await interaction.response.defer()
+            await self.disable_buttons(interaction)
+            if stop_all_lock.locked():
+                await interaction.followup.send(embed=create_info_embed("Already Running", "A stop of all VPS is already in progress."))
+                return
             try:
-                proc = await asyncio.create_subprocess_exec(
-                    "lxc", "stop", "--all", "--force",
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                stdout, stderr = await proc.communicate()
-                if proc.returncode == 0:
-                    stopped_count = 0
-                    for user_id, vps_list in vps_data.items():
-                        for vps in vps_list:
-                            if vps.get('status') == 'running':
-                                vps['status'] = 'stopped'
-                                stopped_count += 1
-                    save_data()
-                    embed = create_success_embed("All VPS Stopped", f"Successfully stopped {stopped_count} VPS using `lxc stop --all --force`")
-                    embed.add_field(name="Command Output", value=f"```\n{stdout.decode() if stdout else 'No output'}\n```", inline=False)
-                    await interaction.followup.send(embed=embed)
-                else:
-                    error_msg = stderr.decode() if stderr else "Unknown error"
-                    embed = create_error_embed("Stop Failed", f"Failed to stop VPS: {error_msg}")
-                    await interaction.followup.send(embed=embed)
+                stopped_count, output = await stop_all_containers()
             except Exception as e:
-                embed = create_error_embed("Error", f"Error stopping VPS: {str(e)}")
-                await interaction.followup.send(embed=embed)
+                await interaction.followup.send(embed=create_error_embed("Stop Failed", f"Failed to stop VPS: {e}"))
+                return
+            embed = create_success_embed("All VPS Stopped", f"Successfully stopped {stopped_count} VPS using `lxc stop --all --force`")
+            embed.add_field(name="Command Output", value=f"```\n{output or 'No output'}\n```", inline=False)
+            await interaction.followup.send(embed=embed)
 
         @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
         async def cancel(self, interaction: discord.Interaction, item: discord.ui.Button):
-            await interaction.response.edit_message(embed=create_info_embed("Operation Cancelled", "The stop all VPS operation has been cancelled."))
+            await self.disable_buttons(interaction, embed=create_info_embed("Operation Cancelled", "The stop all VPS operation has been cancelled."))
 
     await ctx.send(view=ConfirmView())
 
@@ -1053,7 +1563,7 @@ async def cpu_monitor_control(ctx, action: str = "status"):
     global cpu_monitor_active
     if action.lower() == "status":
         status = "Active" if cpu_monitor_active else "Inactive"
-        embed = create_embed("CPU Monitor Status", f"CPU monitoring is currently **{status}**", 0x00ccff if cpu_monitor_active else 0xffaa00)
+        embed = create_embed("CPU Monitor Status", f"CPU monitoring is currently **{status}**", _INFO_COLOR if cpu_monitor_active else _WARNING_COLOR)
         embed.add_field(name="Threshold", value=f"{CPU_THRESHOLD}% CPU usage", inline=True)
         embed.add_field(name="Check Interval", value=f"{CHECK_INTERVAL} seconds", inline=True)
         await ctx.send(embed=embed)
@@ -1074,17 +1584,24 @@ async def resize_vps(ctx, container: str, ram: Optional[int] = None, cpu: Option
     try:
         if ram:
             # LXD expects memory size in bytes or KB/MB; use MB
-            await execute_lxc(f"lxc config set {container} limits.memory {int(ram)*1024}MB")
+            await execute_lxc("lxc", "config", "set", container, "limits.memory", f"{int(ram)*1024}MB")
         if cpu:
-            await execute_lxc(f"lxc config set {container} limits.cpu {cpu}")
+            await execute_lxc("lxc", "config", "set", container, "limits.cpu", str(cpu))
         if storage:
             await set_root_disk_size(container, storage)
-            # Update stored record (if exists)
-            for user_id, vps_list in vps_data.items():
-                for vps in vps_list:
-                    if vps.get('container_name') == container:
-                        vps['storage'] = f"{storage}GB"
-        save_data()
+        # Update stored record (if exists)
+        _, vps = find_vps(container)
+        if vps:
+            if ram:
+                vps['ram'] = f"{ram}GB"
+                vps['ram_mb'] = ram * 1024
+            if cpu:
+                vps['cpu'] = str(cpu)
+                vps['cpu_cores'] = cpu
+            if storage:
+                vps['storage'] = f"{storage}GB"
+                vps['storage_gb'] = storage
+        save_vps()
         await ctx.send(embed=create_success_embed("VPS Resized", f"Specs updated for `{container}`. RAM: {ram or 'unchanged'}GB, CPU: {cpu or 'unchanged'}, Disk: {storage or 'unchanged'}GB"))
     except Exception as e:
         await ctx.send(embed=create_error_embed("Resize Failed", str(e)))
@@ -1106,7 +1623,7 @@ async def purge_protect(ctx, user: discord.Member, vps_number: int):
     vps["protected"] = True
     vps["protected_by"] = str(ctx.author.id)
     vps["protected_at"] = datetime.now().isoformat()
-    save_data()
+    save_vps()
     await ctx.send(embed=create_success_embed(
         "VPS Protected",
         f"VPS #{vps_number} (`{vps['container_name']}`) owned by {user.mention} is now **protected**."
@@ -1128,7 +1645,7 @@ async def purge_unprotect(ctx, user: discord.Member, vps_number: int):
     vps["protected"] = False
     vps.pop("protected_by", None)
     vps.pop("protected_at", None)
-    save_data()
+    save_vps()
     await ctx.send(embed=create_success_embed(
         "VPS Unprotected",
         f"VPS #{vps_number} (`{vps['container_name']}`) owned by {user.mention} is now **unprotected**."
@@ -1139,6 +1656,7 @@ async def purge_unprotect(ctx, user: discord.Member, vps_number: int):
 @is_admin()
 async def purge_vps(ctx):
     """Admins only: Delete ALL VPS that are NOT protected"""
+    author_id = str(ctx.author.id)
     await ctx.send(embed=create_warning_embed(
         "⚠️ Confirm Purge",
         "**This will DELETE all VPS that are NOT PROTECTED.**\nProtected VPS will be skipped.\n\nClick **Confirm** to continue."
@@ -1152,7 +1670,8 @@ async def purge_vps(ctx):
         async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
 
             # only allow original invoker or an admin to confirm
-            if str(interaction.user.id) != str(ctx.author.id) and str(interaction.user.id) not in admin_data.get("admins", []) and str(interaction.user.id) != str(MAIN_ADMIN_ID):
+            uid = str(interaction.user.id)
+            if uid != author_id and not _is_admin(uid):
                 await interaction.response.send_message(embed=create_error_embed("Access Denied", "You are not authorized to confirm this purge."), ephemeral=True)
                 return
 
@@ -1167,8 +1686,11 @@ async def purge_vps(ctx):
                         continue
                     container = vps.get("container_name")
                     try:
-                        await execute_lxc(f"lxc delete {container} --force")
+                        await execute_lxc("lxc", "delete", container, "--force")
                         vps_list.remove(vps)
+                        status_cache.pop(container, None)
+                        # Other handlers may run during the next await; keep the index in step
+                        rebuild_container_index()
                         deleted += 1
                     except Exception as e:
                         logger.exception(f"Purge deletion failed for {container}: {e}")
@@ -1183,7 +1705,7 @@ async def purge_vps(ctx):
                         for guild in bot.guilds:
                             try:
                                 vps_role = await get_or_create_vps_role(guild)
-                                member = guild.get_member(int(user_id))
+                                member = guild.get_member(int(user_id)) or await guild.fetch_member(int(user_id))
                                 if member and vps_role:
                                     await member.remove_roles(vps_role, reason="No VPS after purge")
                             except Exception:
@@ -1191,7 +1713,7 @@ async def purge_vps(ctx):
                     except Exception:
                         pass
 
-            save_data()
+            save_vps()
 
             result = create_success_embed(
                 "Purge Complete",
@@ -1216,7 +1738,7 @@ async def admin_credits(ctx, user: discord.Member, amount: int):
     if user_id not in user_data:
         user_data[user_id] = {"credits": 0}
     user_data[user_id]["credits"] += amount
-    save_data()
+    save_users()
     await ctx.send(embed=create_success_embed("Credits Added", f"Added {amount} credits to {user.mention}\nNew balance: {user_data[user_id]['credits']}"))
 
 @bot.command(name='adminrc')
@@ -1244,26 +1766,24 @@ async def admin_remove_credits(ctx, user: discord.Member, amount_or_all: str):
         except ValueError:
             await ctx.send(embed=create_error_embed("Invalid Amount", "Enter number or 'all'"))
             return
-    save_data()
+    save_users()
     await ctx.send(embed=create_success_embed("Credits Removed", f"{action} from {user.mention}\nRemaining: {user_data[user_id]['credits']}"))
 
 @bot.command(name='admin-add')
 @is_main_admin()
 async def admin_add(ctx, user: discord.Member):
     user_id = str(user.id)
-    if user_id == str(MAIN_ADMIN_ID):
+    if user_id == _MAIN_ADMIN_STR:
         await ctx.send(embed=create_error_embed("Already Admin", "This user is already the main admin!"))
         return
-    if user_id in admin_data.get("admins", []):
+    if user_id in admin_data["admins"]:
         await ctx.send(embed=create_error_embed("Already Admin", f"{user.mention} is already an admin!"))
         return
-    if "admins" not in admin_data:
-        admin_data["admins"] = []
-    admin_data["admins"].append(user_id)
-    save_data()
+    admin_data["admins"].add(user_id)
+    save_admins()
     await ctx.send(embed=create_success_embed("Admin Added", f"{user.mention} is now an admin!"))
     try:
-        await user.send(embed=create_embed("🎉 Admin Role Granted", f"You are now an admin by {ctx.author.mention}", 0x00ff88))
+        await user.send(embed=create_embed("🎉 Admin Role Granted", f"You are now an admin by {ctx.author.mention}", _SUCCESS_COLOR))
     except discord.Forbidden:
         await ctx.send(embed=create_info_embed("Notification Failed", f"Could not DM {user.mention}"))
 
@@ -1271,35 +1791,38 @@ async def admin_add(ctx, user: discord.Member):
 @is_main_admin()
 async def admin_remove(ctx, user: discord.Member):
     user_id = str(user.id)
-    if user_id == str(MAIN_ADMIN_ID):
+    if user_id == _MAIN_ADMIN_STR:
         await ctx.send(embed=create_error_embed("Cannot Remove", "You cannot remove the main admin!"))
         return
-    if user_id not in admin_data.get("admins", []):
+    if user_id not in admin_data["admins"]:
         await ctx.send(embed=create_error_embed("Not Admin", f"{user.mention} is not an admin!"))
         return
-    admin_data["admins"].remove(user_id)
-    save_data()
+    admin_data["admins"].discard(user_id)
+    save_admins()
     await ctx.send(embed=create_success_embed("Admin Removed", f"{user.mention} is no longer an admin!"))
     try:
-        await user.send(embed=create_embed("⚠️ Admin Role Revoked", f"Your admin role was removed by {ctx.author.mention}", 0xff3366))
+        await user.send(embed=create_embed("⚠️ Admin Role Revoked", f"Your admin role was removed by {ctx.author.mention}", _ERROR_COLOR))
     except discord.Forbidden:
         await ctx.send(embed=create_info_embed("Notification Failed", f"Could not DM {user.mention}"))
 
 @bot.command(name='admin-list')
 @is_main_admin()
 async def admin_list(ctx):
-    admins = admin_data.get("admins", [])
-    main_admin = await bot.fetch_user(MAIN_ADMIN_ID)
-    embed = create_embed("👑 Admin Team", "Current administrators:", 0x1a1a1a)
-    embed.add_field(name="🔰 Main Admin", value=f"{main_admin.mention} (ID: {MAIN_ADMIN_ID})", inline=False)
+    admins = sorted(admin_data["admins"])  # Snapshot; admin-add may change the set during the fetches
+    # Fetch the main admin together with the others instead of one REST call after another
+    main_admin, *admin_users = await asyncio.gather(
+        get_user_cached(MAIN_ADMIN_ID), *(get_user_cached(int(admin_id)) for admin_id in admins), return_exceptions=True
+    )
+    main_mention = f"<@{MAIN_ADMIN_ID}>" if isinstance(main_admin, Exception) else main_admin.mention
+    embed = create_embed("👑 Admin Team", "Current administrators:", _DEFAULT_COLOR)
+    embed.add_field(name="🔰 Main Admin", value=f"{main_mention} (ID: {MAIN_ADMIN_ID})", inline=False)
     if admins:
         admin_list = []
-        for admin_id in admins:
-            try:
-                admin_user = await bot.fetch_user(int(admin_id))
-                admin_list.append(f"• {admin_user.mention} (ID: {admin_id})")
-            except:
+        for admin_id, admin_user in zip(admins, admin_users):
+            if isinstance(admin_user, Exception):
                 admin_list.append(f"• Unknown User (ID: {admin_id})")
+            else:
+                admin_list.append(f"• {admin_user.mention} (ID: {admin_id})")
         embed.add_field(name="🛡️ Admins", value="\n".join(admin_list), inline=False)
     else:
         embed.add_field(name="🛡️ Admins", value="No additional admins", inline=False)
@@ -1310,8 +1833,8 @@ async def show_credits(ctx):
     user_id = str(ctx.author.id)
     if user_id not in user_data:
         user_data[user_id] = {"credits": 0}
-        save_data()
-    embed = create_embed("💰 Credit Balance", f"Your account balance:", 0x1a1a1a)
+        save_users()
+    embed = create_embed("💰 Credit Balance", f"Your account balance:", _DEFAULT_COLOR)
     embed.add_field(name="Available Credits", value=f"**{user_data[user_id]['credits']}** credits", inline=False)
     embed.add_field(name="Need More?", value="Use `.buyc` to view payment methods", inline=False)
     await ctx.send(embed=embed)
@@ -1321,120 +1844,155 @@ async def show_credits(ctx):
 async def user_info(ctx, user: discord.Member):
     user_id = str(user.id)
     vps_list = vps_data.get(user_id, [])
+    # Only this user's containers; refresh_statuses skips any with a fresh cache entry
+    await refresh_statuses([vps['container_name'] for vps in vps_list], timeout=10)
     credits = user_data.get(user_id, {}).get("credits", 0)
-    embed = create_embed(f"User Information - {user.name}", f"Detailed information for {user.mention}", 0x1a1a1a)
+    embed = create_embed(f"User Information - {user.name}", f"Detailed information for {user.mention}", _DEFAULT_COLOR)
     embed.add_field(name="👤 User Details", value=f"**Name:** {user.name}\n**ID:** {user.id}\n**Joined:** {user.joined_at.strftime('%Y-%m-%d %H:%M:%S') if user.joined_at else 'Unknown'}", inline=False)
     embed.add_field(name="💰 Credits", value=f"**Balance:** {credits} credits", inline=False)
     if vps_list:
         vps_info = []
-        total_ram = 0
+        total_ram_mb = 0
         total_cpu = 0
         running_count = 0
-        for i, vps in enumerate(vps_list):
-            status_emoji = "🟢" if vps.get('status') == 'running' else "🔴"
-            vps_info.append(f"{status_emoji} VPS {i+1}: `{vps['container_name']}` - {vps.get('status', 'unknown').upper()}")
-            ram_gb = int(vps['ram'].replace('GB', ''))
-            total_ram += ram_gb
-            total_cpu += int(vps['cpu'])
-            if vps.get('status') == 'running':
+        for i, vps in enumerate(vps_list, 1):
+            status = cached_status(vps)
+            if status == 'running':
                 running_count += 1
-        embed.add_field(name="🖥️ VPS Information", value=f"**Total VPS:** {len(vps_list)}\n**Running:** {running_count}\n**Total RAM:** {total_ram}GB\n**Total CPU:** {total_cpu} cores", inline=False)
+            status_emoji, label = status_display(status)
+            vps_info.append(f"{status_emoji} VPS {i}: `{vps['container_name']}` - {label}")
+            total_ram_mb += vps.get('ram_mb', 0)
+            total_cpu += vps.get('cpu_cores', 0)
+        embed.add_field(name="🖥️ VPS Information", value=f"**Total VPS:** {len(vps_list)}\n**Running:** {running_count}\n**Total RAM:** {total_ram_mb // 1024}GB\n**Total CPU:** {total_cpu} cores", inline=False)
         embed.add_field(name="📋 VPS List", value="\n".join(vps_info), inline=False)
     else:
         embed.add_field(name="🖥️ VPS Information", value="**No VPS owned**", inline=False)
-    is_admin_user = user_id == str(MAIN_ADMIN_ID) or user_id in admin_data.get("admins", [])
+    is_admin_user = _is_admin(user_id)
     embed.add_field(name="🛡️ Admin Status", value=f"**Admin:** {'Yes' if is_admin_user else 'No'}", inline=False)
     await ctx.send(embed=embed)
 
 @bot.command(name='serverstats')
 @is_admin()
 async def server_stats(ctx):
-    total_users = len(user_data)
-    total_vps = sum(len(vps_list) for vps_list in vps_data.values())
-    total_credits = sum(user.get('credits', 0) for user in user_data.values())
-    total_ram = 0
-    total_cpu = 0
-    running_vps = 0
-    for vps_list in vps_data.values():
-        for vps in vps_list:
-            try:
-                ram_gb = int(vps['ram'].replace('GB', ''))
-                total_ram += ram_gb
-                total_cpu += int(vps['cpu'])
-                if vps.get('status') == 'running':
-                    running_vps += 1
-            except Exception:
-                continue
-    embed = create_embed("📊 Server Statistics", "Current server overview", 0x1a1a1a)
-    embed.add_field(name="👥 Users", value=f"**Total Users:** {total_users}\n**Total Admins:** {len(admin_data.get('admins', [])) + 1}", inline=False)
-    embed.add_field(name="🖥️ VPS", value=f"**Total VPS:** {total_vps}\n**Running:** {running_vps}\n**Stopped:** {total_vps - running_vps}", inline=False)
-    embed.add_field(name="💰 Economy", value=f"**Total Credits:** {total_credits}", inline=False)
-    embed.add_field(name="📈 Resources", value=f"**Total RAM:** {total_ram}GB\n**Total CPU:** {total_cpu} cores", inline=False)
+    # One `lxc list` for the whole fleet unless reconcile_task (or a previous call) just did it;
+    # a change marks vps dirty, which also drops the cached totals
+    if time.monotonic() - last_reconcile > STATUS_TTL:
+        try:
+            await reconcile_states(timeout=10)
+        except Exception as e:
+            logger.warning(f"Status reconcile for serverstats failed, showing stored status: {e}")
+    totals = get_server_totals()
+    admins = admin_data["admins"]
+    # The default admins file already lists the main admin, so only add one when they're not in the set
+    admin_count = len(admins) + (_MAIN_ADMIN_STR not in admins)
+    other_states = "".join(f"\n**{status.title()}:** {count}" for status, count in totals.statuses.items() if status not in ('running', 'stopped'))
+    embed = create_embed("📊 Server Statistics", "Current server overview", _DEFAULT_COLOR)
+    embed.add_field(name="👥 Users", value=f"**Total Users:** {totals.users}\n**Total Admins:** {admin_count}", inline=False)
+    embed.add_field(name="🖥️ VPS", value=f"**Total VPS:** {totals.vps_count}\n**Running:** {totals.running}\n**Stopped:** {totals.statuses['stopped']}{other_states}", inline=False)
+    embed.add_field(name="💰 Economy", value=f"**Total Credits:** {totals.credits}", inline=False)
+    embed.add_field(name="📈 Resources", value=f"**Total RAM:** {totals.ram_mb // 1024}GB\n**Total CPU:** {totals.cpu_cores} cores", inline=False)
     await ctx.send(embed=embed)
 
-# ----------------- Misc & help -----------------
-@bot.command(name='help')
-async def show_help(ctx):
-    user_id = str(ctx.author.id)
-    is_user_admin = user_id == str(MAIN_ADMIN_ID) or user_id in admin_data.get("admins", [])
-    is_user_main_admin = user_id == str(MAIN_ADMIN_ID)
-
-    embed = create_embed("📚 Command Help", "KEXSON HOSTS V1 Commands:", 0x1a1a1a)
-
-    user_commands = [
-        (".plans", "View available VPS plans"),
-        (".buyc", "Get payment information"),
-        (".buywc <plan> <processor> [storage_GB]", "Purchase VPS with credits (storage optional override)"),
-        (".credits", "Check your credit balance"),
-        (".manage [@user]", "Manage your VPS or another user's VPS (Admin only)"),
-        (".share-user @user <vps_number>", "Share VPS access"),
-        (".share-ruser @user <vps_number>", "Revoke VPS access"),
-        (".manage-shared @owner <vps_number>", "Manage shared VPS")
-    ]
-
-    user_commands_text = "\n".join([f"**{cmd}** - {desc}" for cmd, desc in user_commands])
-    embed.add_field(name="👤 User Commands", value=user_commands_text, inline=False)
+@bot.command(name='recompute-stats')
+@is_admin()
+async def recompute_stats(ctx):
+    """Rebuild the cached server totals from scratch (Admin only)"""
+    global server_totals
+    server_totals = compute_server_totals()
+    await ctx.send(embed=create_success_embed("Stats Recomputed", f"Rescanned {server_totals.users} users and {server_totals.vps_count} VPS."))
 
+# ----------------- Misc & help -----------------
+_USER_COMMANDS = (
+    (".plans", "View available VPS plans"),
+    (".buyc", "Get payment information"),
+    (".buywc <plan> <processor> [storage_GB]", "Purchase VPS with credits (storage optional override)"),
+    (".credits", "Check your credit balance"),
+    (".manage [@user]", "Manage your VPS or another user's VPS (Admin only)"),
+    (".share-user @user <vps_number>", "Share VPS access"),
+    (".share-ruser @user <vps_number>", "Revoke VPS access"),
+    (".manage-shared @owner <vps_number>", "Manage shared VPS"),
+)
+
+_ADMIN_COMMANDS = (
+    (".create @user <ram_GB> <cpu_cores> [storage_GB]", "Create custom VPS"),
+    (".delete-vps @user <vps_number> <reason>", "Delete user's VPS"),
+    (".adminc @user <amount>", "Add credits"),
+    (".adminrc @user <amount/all>", "Remove credits"),
+    (".userinfo @user", "Get detailed user information"),
+    (".serverstats", "Show server statistics"),
+    (".recompute-stats", "Rebuild cached server statistics"),
+    (".vpsinfo [container]", "Get VPS information"),
+    (".list-all", "View all VPS and user information"),
+    (".restart-vps <container>", "Restart a VPS"),
+    (".backup-vps <container>", "Create VPS snapshot"),
+    (".restore-vps <container> <snapshot>", "Restore from snapshot"),
+    (".list-snapshots <container>", "List VPS snapshots"),
+    (".exec <container> <command>", "Execute command in VPS"),
+    (".stop-vps-all", "Stop all VPS with lxc stop --all --force"),
+    (".cpu-monitor <status|enable|disable>", "Control CPU monitoring system"),
+    (".resize <container> [ram_GB] [cpu] [storage_GB]", "Resize an existing VPS's resources"),
+)
+
+_MAIN_ADMIN_COMMANDS = (
+    (".admin-add @user", "Promote to admin"),
+    (".admin-remove @user", "Remove admin"),
+    (".admin-list", "View all admins"),
+)
+
+def _commands_text(command_list):
+    return "\n".join([f"**{cmd}** - {desc}" for cmd, desc in command_list])
+
+_USER_COMMANDS_TEXT = _commands_text(_USER_COMMANDS)
+_ADMIN_COMMANDS_TEXT = _commands_text(_ADMIN_COMMANDS)
+_MAIN_ADMIN_COMMANDS_TEXT = _commands_text(_MAIN_ADMIN_COMMANDS)
+
+_HELP_FOOTER = "KEXSON HOSTS V1 • No auto-shutdown • Clean performance"
+
+def _build_help_embed(is_user_admin, is_user_main_admin):
+    embed = create_embed("📚 Command Help", "KEXSON HOSTS V1 Commands:", _DEFAULT_COLOR)
+    embed.add_field(name="👤 User Commands", value=_USER_COMMANDS_TEXT, inline=False)
     if is_user_admin:
-        admin_commands = [
-            (".create @user <ram_GB> <cpu_cores> [storage_GB]", "Create custom VPS"),
-            (".delete-vps @user <vps_number> <reason>", "Delete user's VPS"),
-            (".adminc @user <amount>", "Add credits"),
-            (".adminrc @user <amount/all>", "Remove credits"),
-            (".userinfo @user", "Get detailed user information"),
-            (".serverstats", "Show server statistics"),
-            (".vpsinfo [container]", "Get VPS information"),
-            (".list-all", "View all VPS and user information"),
-            (".restart-vps <container>", "Restart a VPS"),
-            (".backup-vps <container>", "Create VPS snapshot"),
-            (".restore-vps <container> <snapshot>", "Restore from snapshot"),
-            (".list-snapshots <container>", "List VPS snapshots"),
-            (".exec <container> <command>", "Execute command in VPS"),
-            (".stop-vps-all", "Stop all VPS with lxc stop --all --force"),
-            (".cpu-monitor <status|enable|disable>", "Control CPU monitoring system"),
-            (".resize <container> [ram_GB] [cpu] [storage_GB]", "Resize an existing VPS's resources")
-        ]
-
-        admin_commands_text = "\n".join([f"**{cmd}** - {desc}" for cmd, desc in admin_commands])
-        embed.add_field(name="🛡️ Admin Commands", value=admin_commands_text, inline=False)
-
+        embed.add_field(name="🛡️ Admin Commands", value=_ADMIN_COMMANDS_TEXT, inline=False)
     if is_user_main_admin:
-        main_admin_commands = [
-            (".admin-add @user", "Promote to admin"),
-            (".admin-remove @user", "Remove admin"),
-            (".admin-list", "View all admins")
-        ]
+        embed.add_field(name="👑 Main Admin Commands", value=_MAIN_ADMIN_COMMANDS_TEXT, inline=False)
+    embed.set_footer(text=_HELP_FOOTER)
+    return embed
 
-        main_admin_commands_text = "\n".join([f"**{cmd}** - {desc}" for cmd, desc in main_admin_commands])
-        embed.add_field(name="👑 Main Admin Commands", value=main_admin_commands_text, inline=False)
+# Only three audiences see different help, and the help footer has no timestamp, so build each once
+_HELP_EMBED_USER = _build_help_embed(False, False)
+_HELP_EMBED_ADMIN = _build_help_embed(True, False)
+_HELP_EMBED_MAIN = _build_help_embed(True, True)
 
-    embed.set_footer(text="KEXSON HOSTS V1 • No auto-shutdown • Clean performance")
+@bot.command(name='help')
+async def show_help(ctx):
+    user_id = str(ctx.author.id)
+    if user_id == _MAIN_ADMIN_STR:
+        embed = _HELP_EMBED_MAIN
+    elif user_id in admin_data["admins"]:
+        embed = _HELP_EMBED_ADMIN
+    else:
+        embed = _HELP_EMBED_USER
     await ctx.send(embed=embed)
 
 # ----------------- Startup -----------------
+def create_loop_primitives():
+    """Create the module's asyncio primitives from setup_hook, i.e. on the loop bot.run() starts.
+       Before Python 3.10 they bind to the loop current at creation, which at import is a different one."""
+    global data_ready, save_event, save_lock, LXC_SEM, LXC_READ_SEM, LXC_LONG_SEM, stop_all_lock
+    data_ready = asyncio.Event()
+    save_event = asyncio.Event()
+    save_lock = asyncio.Lock()
+    LXC_SEM = asyncio.Semaphore(LXC_MAX_CONCURRENCY)
+    LXC_READ_SEM = asyncio.Semaphore(LXC_READ_CONCURRENCY)
+    LXC_LONG_SEM = asyncio.Semaphore(LXC_LONG_CONCURRENCY)
+    stop_all_lock = asyncio.Lock()
+
 @bot.event
 async def on_ready():
     logger.info(f'{bot.user} has connected to Discord!')
+    start_background_task('flusher', flusher)
+    start_background_task('cpu_monitor', cpu_monitor_task)
+    start_background_task('reconcile', reconcile_task)
     await bot.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name="KEXSON HOSTS V1"))
     logger.info("Bot is ready!")
 